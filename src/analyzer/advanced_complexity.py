@@ -457,20 +457,19 @@ class AdvancedComplexityAnalyzer:
                 recursive_calls.append(node)
             
             # Escanea recursivamente TODOS los atributos que podrían contener nodos
-            if hasattr(node, '__dict__'):
-                for attr_name, attr_value in node.__dict__.items():
-                    if attr_value is not None:
-                        if isinstance(attr_value, list):
-                            for child in attr_value:
-                                if hasattr(child, '__dict__'):  # Verifica si es un nodo
-                                    scan_node(child)
-                        elif hasattr(attr_value, '__dict__'):  # Verifica si es un nodo
-                            scan_node(attr_value)
+            for attr_value in vars(node).values():
+                if isinstance(attr_value, list):
+                    for child in attr_value:
+                        if isinstance(child, Node):  # Sólo se desciende en nodos del AST
+                            scan_node(child)
+                elif isinstance(attr_value, Node):
+                    scan_node(attr_value)
         
         # Escanea el cuerpo de la función
         if func.body:
             for stmt in func.body:
-                scan_node(stmt)
+                if isinstance(stmt, Node):
+                    scan_node(stmt)
         
         # Si se encuentran llamadas recursivas, clasifica el patrón de recursión
         if recursive_calls:
@@ -13,30 +13,197 @@ Fundamentos Matematicos:
 - Determinacion precisa de cotas asintoticas
 """
 
-from typing import Dict, Optional, Tuple, List, Any
-from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple, List, Any
+from types import MappingProxyType
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from collections import OrderedDict
+from functools import lru_cache
+import weakref
+import sys
 import re
 import math
 from src.ast.nodes import *
 
 
-@dataclass
+# Patrones precompilados para leer coeficientes y exponentes de las recurrencias
+_RE_COEF_N1 = re.compile(r'(\d+)t\(n-1\)')
+_RE_NPOW = re.compile(r'n\^(\d+)')
+_RE_DC = re.compile(r'(\d*)t\(n/(\d+)\)')
+
+# Valores frecuentes de f(n), notacion y metodo, internados para compartir un unico objeto
+_FN_C = sys.intern("c")
+_FN_N = sys.intern("n")
+_THETA = sys.intern("Θ")
+_BIG_O = sys.intern("O")
+_M_MASTER = sys.intern("Master Theorem")
+_M_SUBST = sys.intern("Substitution")
+_M_TREE = sys.intern("Recurrence Tree")
+_M_LOOP = sys.intern("Loop Analysis")
+
+# Casos base compartidos (solo lectura) por todas las recurrencias construidas
+_BC_01 = MappingProxyType({"T(0)": "c", "T(1)": "c"})
+_BC_10 = MappingProxyType({"T(1)": "c", "T(0)": "c"})
+_BC_1 = MappingProxyType({"T(1)": "c"})
+_BC_0 = MappingProxyType({"T(0)": "c"})
+_BC_NONE = MappingProxyType({})
+
+
+@lru_cache(maxsize=64)
+def _log_b(a: int, b: int) -> float:
+    """log_b(a); con b == 2 usa log2, que es exacto para potencias de dos."""
+    if b == 2:
+        return math.log2(a)
+    return math.log(a) / math.log(b)
+
+
+# log_b(a) precalculado para los pares (a, b) habituales del Teorema Maestro
+_LOG_B_A = {(a, b): _log_b(a, b) for a in range(1, 17) for b in range(2, 9)}
+
+
+# Cadenas de complejidad frecuentes, internadas para que todos los analisis compartan el mismo objeto:
+# ('poly', k) -> n^k, ('log', k) -> n^k log n, ('exp', a) -> a^n
+_COMPLEXITY_STRINGS = {
+    **{('poly', k): sys.intern("1" if k == 0 else "n" if k == 1 else f"n^{k}") for k in range(9)},
+    **{('log', k): sys.intern("log n" if k == 0 else "n log n" if k == 1 else f"n^{k} log n") for k in range(9)},
+    **{('exp', a): sys.intern(f"{a}^n") for a in range(2, 9)},
+}
+
+
+# Exponente c de f(n) = n^c para los valores de f(n) que generan los constructores
+_C_OF_FN = {"c": 0, "1": 0, "n": 1, "n^2": 2, "n^3": 3, "n^4": 4}
+
+
+def _log_b_a(a: int, b: int) -> float:
+    """log_b(a) para el Teorema Maestro, desde la tabla si el par es habitual."""
+    log_b_a = _LOG_B_A.get((a, b))
+    return log_b_a if log_b_a is not None else _log_b(a, b)
+
+
+def _exact_log(a: int, b: int) -> Optional[int]:
+    """k tal que a = b^k, con aritmetica entera; None si a no es potencia de b."""
+    if a < 1 or b < 2:
+        return None
+    k = 0
+    while a % b == 0:
+        a //= b
+        k += 1
+    return k if a == 1 else None
+
+
+def _master_case(c: int, log_b_a: float, epsilon: float = 0.01) -> int:
+    """Nucleo numerico del Teorema Maestro: compara el exponente de f(n) con log_b(a) (caso 1/2/3)."""
+    if c < log_b_a - epsilon:
+        return 1
+    if abs(c - log_b_a) < epsilon:
+        return 2
+    return 3
+
+
+def _complexity_string(kind: str, k: int) -> str:
+    """Cadena de complejidad para (tipo, exponente); solo se formatea si no esta en la tabla."""
+    cached = _COMPLEXITY_STRINGS.get((kind, k))
+    if cached is not None:
+        return cached
+    if kind == 'poly':
+        return f"n^{k}"
+    if kind == 'log':
+        return f"n^{k} log n"
+    return f"{k}^n"
+
+
+# Atributos que contienen sentencias hijas, por tipo de nodo. Los tipos que no
+# aparecen (expresiones, objetos ajenos al AST) se sondean con _STATEMENT_ATTRS.
+_STATEMENT_ATTRS = ('body', 'functions', 'then_body', 'else_body')
+_CHILD_ATTRS = {
+    Program: ('functions',),
+    Function: ('body',),
+    For: ('body',),
+    While: ('body',),
+    Repeat: ('body',),
+    If: ('then_body', 'else_body'),
+    Assignment: (),
+    Return: (),
+    Call: (),
+}
+
+
+def _children(node) -> List[Any]:
+    """Sentencias hijas de un nodo: body, functions, then_body y else_body concatenados."""
+    children = []
+    for attr in _CHILD_ATTRS.get(type(node), _STATEMENT_ATTRS):
+        value = getattr(node, attr, None)
+        if value:
+            if type(value) is list:
+                children.extend(value)
+            else:
+                children.append(value)
+    return [child for child in children if child]
+
+
+# Los nodos del AST no tienen subclases: type(nodo) basta y evita recorrer el MRO
+_LOOP_TYPES = frozenset((For, While, Repeat))
+
+
+def _loop_depth(node) -> int:
+    """Profundidad maxima de bucles anidados, recorriendo el AST con pila explicita."""
+    best = 0
+    stack = [(node, 0)]
+    while stack:
+        current, depth = stack.pop()
+        if type(current) in _LOOP_TYPES:
+            depth += 1
+            if depth > best:
+                best = depth
+        for child in _children(current):
+            stack.append((child, depth))
+    return best
+
+
+class Method(IntEnum):
+    """Metodo de resolucion; indexa directamente la tabla de resolutores."""
+    MASTER = 0
+    SUBST = 1
+    TREE = 2
+    LOOP = 3
+
+
+class Pattern(IntEnum):
+    """Forma estructural de la recurrencia, fijada al construirla."""
+    GENERIC = 0
+    FIB = 1  # T(n) = T(n-1) + T(n-2) + c
+
+
+# Nombres visibles de cada metodo (method_used se sigue mostrando como texto)
+_METHOD_BY_NAME = {
+    _M_MASTER: Method.MASTER,
+    _M_SUBST: Method.SUBST,
+    _M_TREE: Method.TREE,
+    _M_LOOP: Method.LOOP,
+}
+
+
+@dataclass(slots=True, frozen=True)
 class RecurrenceEquation:
-    """Representa una ecuacion de recurrencia formal."""
+    """Representa una ecuacion de recurrencia formal (inmutable, se comparte entre caches)."""
     equation: str           # T(n) = aT(n/b) + f(n) o similar
     a: Optional[int]        # Numero de llamadas recursivas
     b: Optional[int]        # Factor de division
     f_n: str                # Trabajo realizado por llamada
-    base_cases: Dict[str, str]  # Definiciones de casos base
+    base_cases: Mapping[str, str]  # Definiciones de casos base
     method_used: str        # Metodo de resolucion (Maestro, Sustitucion, Arbol)
+    complexity_hint: Optional[str] = None  # Complejidad ya conocida al construir la ecuacion (analisis de bucles)
+    method: Optional[Method] = None        # Etiqueta entera del metodo (None: se deduce de method_used)
+    pattern: Pattern = Pattern.GENERIC     # Forma de la recurrencia
+    log_b_a: Optional[float] = None        # log_b(a) precalculado (recurrencias del Teorema Maestro)
 
     def __str__(self) -> str:
         return self.equation
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AsymptoticBound:
-    """Representa la cota de complejidad asintotica."""
+    """Representa la cota de complejidad asintotica (inmutable, se comparte entre caches)."""
     complexity: str         # La clase de complejidad (por ejemplo, "n^2", "2^n")
     notation: str           # "Θ" para cota estricta, "O" para cota superior, "Ω" para cota inferior
     confidence: float       # Nivel de confianza (0.0 a 1.0)
@@ -46,67 +213,173 @@ class AsymptoticBound:
         return f"{self.notation}({self.complexity})"
 
 
+# Recurrencias de forma fija, construidas una sola vez al cargar el modulo (son inmutables)
+_LINEAR_REC = RecurrenceEquation(
+    equation="T(n) = T(n-1) + c",
+    a=1, b=None, f_n=_FN_C,
+    base_cases=_BC_01,
+    method_used=_M_SUBST, method=Method.SUBST
+)
+# Cota de _LINEAR_REC, conocida de antemano (la misma que da el metodo de sustitucion)
+_LINEAR_BND = AsymptoticBound("n", _THETA, 0.95, "Sustitucion: T(n) = T(n-1) + c se expande a n*c")
+_BINSEARCH_REC = RecurrenceEquation(
+    equation="T(n) = T(n/2) + c",
+    a=1, b=2, f_n=_FN_C,
+    base_cases=_BC_10,
+    method_used=_M_MASTER, method=Method.MASTER, log_b_a=_log_b_a(1, 2)
+)
+_FIB_REC = RecurrenceEquation(
+    equation="T(n) = T(n-1) + T(n-2) + c",
+    a=2, b=None, f_n=_FN_C,
+    base_cases=_BC_01,
+    method_used=_M_TREE, method=Method.TREE, pattern=Pattern.FIB
+)
+
+
+# Ecuacion y complejidad del analisis de bucles por profundidad de anidamiento
+_ITER_TABLE = {
+    0: ("T(n) = c", "1"),
+    1: ("T(n) = cn", "n"),
+    2: ("T(n) = cn^2", _complexity_string('poly', 2)),
+}
+
+# Desglose de costos por nivel (estimate_level_costs), compartido entre llamadas
+_LEVELS_BINSEARCH = (
+    "Nivel k: 1 nodo de tamano n/2^k; costo nivel ~= c",
+    "Altura ~= log2(n); Trabajo total ~= c*log n",
+)
+_LEVELS_DC = (
+    "Nivel k: 2^k nodos de tamano n/2^k; costo nivel ~= n",
+    "Altura ~= log2(n); Trabajo total ~= n*log n + n",
+)
+_LEVELS_FIB = (
+    "Nivel k: ~2^k nodos; costo nivel ~= 2^k (2?1.618)",
+    "Altura ~= n; Trabajo total ~= 2^n",
+)
+_LEVELS_LINEAR = (
+    "Nivel k: 1 nodo; costo nivel ~= c",
+    "Altura ~= n; Trabajo total ~= n",
+)
+_LEVELS_UNKNOWN = ("Patron no reconocido para desglose por niveles.",)
+
+# Ecuaciones normalizadas (sin espacios, en minusculas) que generan el analizador y el solver recursivo
+_LEVEL_COSTS = {
+    "t(n)=t(n/2)+c": _LEVELS_BINSEARCH,
+    "t(n)=t(n/2)+o(1)": _LEVELS_BINSEARCH,
+    "t(n)=2t(n/2)+n": _LEVELS_DC,
+    "t(n)=2t(n/2)+o(n)": _LEVELS_DC,
+    "t(n)=t(n-1)+t(n-2)+c": _LEVELS_FIB,
+    "t(n)=t(n-1)+t(n-2)+o(1)": _LEVELS_FIB,
+    "t(n)=t(n-1)+c": _LEVELS_LINEAR,
+    "t(n)=t(n-1)+o(1)": _LEVELS_LINEAR,
+}
+
+
+def _dc_rec(a: int) -> RecurrenceEquation:
+    """Recurrencia divide y venceras T(n) = aT(n/2) + n."""
+    return RecurrenceEquation(
+        equation=f"T(n) = {a}T(n/2) + n",
+        a=a, b=2, f_n=_FN_N,
+        base_cases=_BC_1,
+        method_used=_M_MASTER, method=Method.MASTER, log_b_a=_log_b_a(a, 2)
+    )
+
+
+# Recurrencias divide y venceras para los numeros de llamadas habituales
+_DC_RECS = {a: _dc_rec(a) for a in range(1, 9)}
+
+
 class AsymptoticAnalyzer:
     """
     Realiza un analisis asintotico formal de algoritmos.
     """
 
-    def __init__(self):
-        self.analysis_cache: Dict[str, AsymptoticBound] = {}
+    def __init__(self, cache_size: int = 256):
+        # Cache de memorizacion: clave estructural -> (recurrencia, cota), con expulsion LRU
+        self.cache_size = cache_size
+        self.analysis_cache: "OrderedDict[Tuple, Tuple[RecurrenceEquation, AsymptoticBound]]" = OrderedDict()
+        # Profundidad de bucles por nodo sin anotar (se libera junto con el nodo)
+        self._scan_cache: "weakref.WeakKeyDictionary[Node, int]" = weakref.WeakKeyDictionary()
 
     def analyze(self, node, recursive_info: Optional[Dict] = None) -> Tuple[RecurrenceEquation, AsymptoticBound]:
-        """Analisis asintotico para un programa completo."""
+        """Analisis asintotico para un programa completo (memorizado por estructura)."""
+        key = self._make_key(recursive_info, node)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            self.analysis_cache.move_to_end(key)
+            return cached
+
         recurrence = self._construct_recurrence(node, recursive_info)
         bound = self._solve_recurrence(recurrence)
+
+        self.analysis_cache[key] = (recurrence, bound)
+        if len(self.analysis_cache) > self.cache_size:
+            self.analysis_cache.popitem(last=False)
         return recurrence, bound
 
+    def clear_cache(self):
+        """Vaciar la cache de analisis."""
+        self.analysis_cache.clear()
+        self._scan_cache.clear()
+
+    def _make_key(self, recursive_info: Optional[Dict], node) -> Tuple:
+        """
+        Clave de memorizacion estructural: dos ASTs equivalentes de distintos
+        parseos comparten entrada. Solo incluye lo que lee el analisis: los campos
+        de recursive_info si hay recursion y, si no, la profundidad de bucles
+        (que solo entonces se calcula).
+        """
+        if recursive_info and recursive_info.get('has_recursion'):
+            return (
+                recursive_info.get('pattern_type', 'linear'),
+                len(recursive_info.get('recursive_calls') or []),
+                recursive_info.get('recurrence_relation'),
+                repr(recursive_info.get('base_cases')),
+            )
+        return (None, self._count_loop_depth(node))
+
     def analyze_function_node(self, func_node, recursive_info):
         """Analiza la complejidad de una funcion especifica (nodo AST)."""
-        try:
-            recurrence = self._construct_recurrence(func_node, recursive_info)
-            bound = self._solve_recurrence(recurrence)
-
-            if not bound.notation:
-                bound.notation = "Θ"
+        # Recursion lineal sin relacion derivada: el resultado se conoce sin construir ni resolver nada
+        if (recursive_info and recursive_info.get('has_recursion')
+                and recursive_info.get('pattern_type') == 'linear'
+                and not recursive_info.get('recurrence_relation')):
+            return _LINEAR_REC, _LINEAR_BND
 
-            if recursive_info and recursive_info.get('pattern_type') == 'linear':
-                if bound.complexity == "1" or not bound.complexity:
-                    bound.complexity = "n"
-                    bound.notation = "Θ"
-
-            return recurrence, bound
+        try:
+            recurrence, bound = self.analyze(func_node, recursive_info)
         except Exception as e:  # Retorno de seguridad en caso de fallo interno
             return (
-                RecurrenceEquation("Error interno", None, None, "", {}, "Error"),
-                AsymptoticBound("?", "O", 0.0, str(e))
+                RecurrenceEquation("Error interno", None, None, "", _BC_NONE, "Error"),
+                AsymptoticBound("?", _BIG_O, 0.0, str(e))
             )
 
+        if not bound.notation:
+            bound = replace(bound, notation=_THETA)
+
+        if recursive_info and recursive_info.get('pattern_type') == 'linear':
+            if bound.complexity == "1" or not bound.complexity:
+                bound = replace(bound, complexity="n", notation=_THETA)
+
+        return recurrence, bound
+
     def estimate_level_costs(self, equation: str) -> list:
         """Resumen textual de costos por nivel para patrones comunes."""
         if not equation:
             return []
 
         eq = equation.replace(" ", "").lower()
-        levels = []
-
-        if "t(n/2)" in eq and eq.startswith("t(n)="):
-            calls = 2 if "2t(n/2)" in eq else 1
-            if calls == 1:
-                levels.append("Nivel k: 1 nodo de tamano n/2^k; costo nivel ~= c")
-                levels.append("Altura ~= log2(n); Trabajo total ~= c*log n")
+        levels = _LEVEL_COSTS.get(eq)
+        if levels is None:
+            if "t(n/2)" in eq and eq.startswith("t(n)="):
+                levels = _LEVELS_DC if "2t(n/2)" in eq else _LEVELS_BINSEARCH
+            elif "t(n-1)" in eq and "t(n-2)" in eq:
+                levels = _LEVELS_FIB
+            elif "t(n-1)" in eq:
+                levels = _LEVELS_LINEAR
             else:
-                levels.append("Nivel k: 2^k nodos de tamano n/2^k; costo nivel ~= n")
-                levels.append("Altura ~= log2(n); Trabajo total ~= n*log n + n")
-        elif "t(n-1)" in eq and "t(n-2)" in eq:
-            levels.append("Nivel k: ~2^k nodos; costo nivel ~= 2^k (2?1.618)")
-            levels.append("Altura ~= n; Trabajo total ~= 2^n")
-        elif "t(n-1)" in eq:
-            levels.append("Nivel k: 1 nodo; costo nivel ~= c")
-            levels.append("Altura ~= n; Trabajo total ~= n")
-        else:
-            levels.append("Patron no reconocido para desglose por niveles.")
-
-        return levels
+                levels = _LEVELS_UNKNOWN
+        return list(levels)
 
     def _construct_recurrence(self, node, recursive_info: Optional[Dict]) -> RecurrenceEquation:
         """Construir la relacion de recurrencia formal."""
@@ -115,127 +388,115 @@ class AsymptoticAnalyzer:
 
         # Si el analizador recursivo ya dedujo la recurrencia, usala directamente
         relation = recursive_info.get('recurrence_relation')
-        base_cases = recursive_info.get('base_cases') or {"T(0)": "c", "T(1)": "c"}
+        base_cases = recursive_info.get('base_cases') or _BC_01
         if relation:
             normalized = relation.replace(' ', '').lower()
             a = None
             b = None
-            f_n = "c"
+            f_n = _FN_C
             method = "Derived from recursive analysis"
-
-            if "t(n/2)" in normalized:
-                a = 2 if "2t(n/2)" in normalized else 1
-                b = 2
+            pattern = Pattern.GENERIC
+
+            dc_match = _RE_DC.search(normalized)
+            dc_a = dc_b = 0
+            if dc_match:
+                dc_a = int(dc_match.group(1) or 1)
+                dc_b = int(dc_match.group(2))
+            # El Teorema Maestro exige a >= 1 y b >= 2 (T(n/1) o 0T(n/2) usan la cota por defecto)
+            if dc_a >= 1 and dc_b >= 2:
+                a = dc_a
+                b = dc_b
                 if "o(n)" in normalized or "+n" in normalized:
-                    f_n = "n"
-                method = "Master Theorem"
+                    f_n = _FN_N
+                method = _M_MASTER
             elif "t(n-1)" in normalized and "t(n-2)" in normalized:
                 a = 2
-                f_n = "c"
-                method = "Recurrence Tree"
+                f_n = _FN_C
+                method = _M_TREE
+                if "t(n-1)+t(n-2)" in normalized:
+                    pattern = Pattern.FIB
             elif "t(n-1)" in normalized:
-                coef_match = re.search(r'(\d+)t\(n-1\)', normalized)
+                coef_match = _RE_COEF_N1.search(normalized)
                 a = int(coef_match.group(1)) if coef_match else 1
-                f_n = "c"
-                method = "Substitution"
+                f_n = _FN_C
+                method = _M_SUBST
 
             return RecurrenceEquation(
                 equation=relation,
                 a=a, b=b, f_n=f_n,
                 base_cases=base_cases,
-                method_used=method
+                method_used=method,
+                method=_METHOD_BY_NAME.get(method),
+                pattern=pattern,
+                log_b_a=_log_b_a(a, b) if b is not None else None
             )
 
-        num_calls = len(recursive_info.get('recursive_calls', [])) or 1
-        pattern_type = recursive_info.get('pattern_type', 'linear')
+        pattern = recursive_info.get('pattern_type', 'linear')
+        calls = recursive_info.get('recursive_calls') or []
+        builder = self._RECURRENCE_BUILDERS.get(pattern, AsymptoticAnalyzer._mk_multi)
+        return builder(self, node, pattern, calls, len(calls))
 
-        if pattern_type == 'linear':
-            return RecurrenceEquation(
-                equation="T(n) = T(n-1) + c",
-                a=1, b=None, f_n="c",
-                base_cases={"T(0)": "c", "T(1)": "c"},
-                method_used="Substitution"
-            )
-        elif pattern_type == 'binary_exclusive':
-            return RecurrenceEquation(
-                equation="T(n) = T(n/2) + c",
-                a=1, b=2, f_n="c",
-                base_cases={"T(1)": "c", "T(0)": "c"},
-                method_used="Master Theorem"
-            )
-        elif pattern_type == 'binary':
-            return RecurrenceEquation(
-                equation="T(n) = T(n-1) + T(n-2) + c",
-                a=2, b=None, f_n="c",
-                base_cases={"T(0)": "c", "T(1)": "c"},
-                method_used="Recurrence Tree"
-            )
-        elif pattern_type == 'divide_conquer':
-            a = num_calls if num_calls > 0 else 2
-            return RecurrenceEquation(
-                equation=f"T(n) = {a}T(n/2) + n",
-                a=a, b=2, f_n="n",
-                base_cases={"T(1)": "c"},
-                method_used="Master Theorem"
-            )
-        else:
-            return RecurrenceEquation(
-                equation=f"T(n) = {num_calls}T(n-1) + c",
-                a=num_calls, b=None, f_n="c",
-                base_cases={"T(0)": "c", "T(1)": "c"},
-                method_used="Substitution"
-            )
+    # ---- Constructores de recurrencia por patron (despachados desde _construct_recurrence) ----
+
+    def _mk_linear(self, node, pattern: str, calls: List, num_calls: int) -> RecurrenceEquation:
+        return _LINEAR_REC
+
+    def _mk_binary_exclusive(self, node, pattern: str, calls: List, num_calls: int) -> RecurrenceEquation:
+        return _BINSEARCH_REC
+
+    def _mk_binary(self, node, pattern: str, calls: List, num_calls: int) -> RecurrenceEquation:
+        return _FIB_REC
+
+    def _mk_divide_conquer(self, node, pattern: str, calls: List, num_calls: int) -> RecurrenceEquation:
+        a = num_calls or 1
+        return _DC_RECS.get(a) or _dc_rec(a)
+
+    def _mk_multi(self, node, pattern: str, calls: List, num_calls: int) -> RecurrenceEquation:
+        num_calls = num_calls or 1
+        return RecurrenceEquation(
+            equation=f"T(n) = {num_calls}T(n-1) + c",
+            a=num_calls, b=None, f_n=_FN_C,
+            base_cases=_BC_01,
+            method_used=_M_SUBST, method=Method.SUBST
+        )
+
+    _RECURRENCE_BUILDERS = {
+        'linear': _mk_linear,
+        'binary_exclusive': _mk_binary_exclusive,
+        'binary': _mk_binary,
+        'divide_conquer': _mk_divide_conquer,
+    }
 
     def _analyze_iterative(self, node) -> RecurrenceEquation:
         """Analizar algoritmo iterativo (no recursivo)."""
         loop_depth = self._count_loop_depth(node)
-
-        if loop_depth == 0:
-            equation = "T(n) = c"
-        elif loop_depth == 1:
-            equation = "T(n) = cn"
-        elif loop_depth == 2:
-            equation = "T(n) = cn^2"
-        else:
-            equation = f"T(n) = cn^{loop_depth}"
+        entry = _ITER_TABLE.get(loop_depth)
+        if entry is None:
+            entry = (f"T(n) = cn^{loop_depth}", _complexity_string('poly', loop_depth))
+        equation, complexity = entry
 
         return RecurrenceEquation(
-            equation=equation, a=None, b=None, f_n="c",
-            base_cases={"T(0)": "c"}, method_used="Loop Analysis"
+            equation=equation, a=None, b=None, f_n=_FN_C,
+            base_cases=_BC_0, method_used=_M_LOOP, method=Method.LOOP,
+            complexity_hint=complexity
         )
 
+    def _scan_loop_depth(self, node) -> int:
+        """Profundidad de bucles de un nodo sin anotar, memorizada por nodo."""
+        if not isinstance(node, Node):
+            return _loop_depth(node)
+        depth = self._scan_cache.get(node)
+        if depth is None:
+            depth = self._scan_cache[node] = _loop_depth(node)
+        return depth
+
     def _count_loop_depth(self, node, current_depth: int = 0) -> int:
         """Contar la profundidad maxima de anidamiento de bucles."""
-        max_depth = current_depth
-
-        if isinstance(node, (For, While, Repeat)):
-            body_depth = current_depth + 1
-            if hasattr(node, 'body') and node.body:
-                for stmt in node.body:
-                    depth = self._count_loop_depth(stmt, body_depth)
-                    max_depth = max(max_depth, depth)
-
-        elif isinstance(node, (Function, Program)):
-            items = node.body if hasattr(node, 'body') else (node.functions if hasattr(node, 'functions') else [])
-            if items:
-                for item in items:
-                    depth = self._count_loop_depth(item, current_depth)
-                    max_depth = max(max_depth, depth)
-
-        elif isinstance(node, If):
-            if hasattr(node, 'then_body') and node.then_body:
-                stmts = node.then_body if isinstance(node.then_body, list) else [node.then_body]
-                for stmt in stmts:
-                    depth = self._count_loop_depth(stmt, current_depth)
-                    max_depth = max(max_depth, depth)
-
-            if hasattr(node, 'else_body') and node.else_body:
-                stmts = node.else_body if isinstance(node.else_body, list) else [node.else_body]
-                for stmt in stmts:
-                    depth = self._count_loop_depth(stmt, current_depth)
-                    max_depth = max(max_depth, depth)
-
-        return max_depth
+        # El parser ya anota la profundidad; solo se recorre el AST si no esta disponible
+        depth = getattr(node, 'loop_depth', None)
+        if depth is None:
+            depth = self._scan_loop_depth(node)
+        return current_depth + depth
 
     def _has_middle_calculation(self, node) -> bool:
         """Detecta si el algoritmo calcula un punto medio."""
@@ -270,99 +531,83 @@ class AsymptoticAnalyzer:
 
     def _solve_recurrence(self, recurrence: RecurrenceEquation) -> AsymptoticBound:
         """Resolver la ecuacion de recurrencia."""
-        method = recurrence.method_used
-        if method == "Master Theorem":
-            return self._apply_master_theorem(recurrence)
-        elif method == "Substitution":
-            return self._apply_substitution(recurrence)
-        elif method == "Recurrence Tree":
-            return self._apply_tree_method(recurrence)
-        elif method == "Loop Analysis":
-            return self._analyze_loops(recurrence)
-        else:
-            return AsymptoticBound("n", "O", 0.5, "Default analysis")
+        method = recurrence.method
+        if method is None:
+            method = _METHOD_BY_NAME.get(recurrence.method_used)
+            if method is None:
+                return AsymptoticBound("n", _BIG_O, 0.5, "Default analysis")
+
+        return self._SOLVERS[method](self, recurrence)
 
     def _apply_master_theorem(self, rec: RecurrenceEquation) -> AsymptoticBound:
         a, b, f_n = rec.a, rec.b, rec.f_n
         if a is None or b is None:
-            return AsymptoticBound("n", "Θ", 0.7, "Teorema Maestro no aplicable")
+            return AsymptoticBound("n", _THETA, 0.7, "Teorema Maestro no aplicable")
 
-        log_b_a = math.log(a) / math.log(b)
-
-        if f_n == "c" or f_n == "1":
-            c = 0
-        elif f_n == "n":
-            c = 1
-        elif f_n == "n^2":
-            c = 2
-        else:
-            match = re.search(r'n\^(\d+)', f_n)
+        c = _C_OF_FN.get(f_n)
+        if c is None:
+            match = _RE_NPOW.search(f_n)
             c = int(match.group(1)) if match else 1
 
-        epsilon = 0.01
-        if c < log_b_a - epsilon:
-            complexity = self._format_complexity(log_b_a)
+        log_b_a = rec.log_b_a
+        if log_b_a is None:
+            log_b_a = _log_b_a(a, b)
+        case = _master_case(c, log_b_a)
+        if case == 1:
+            exact = _exact_log(a, b)
+            complexity = _complexity_string('poly', exact) if exact is not None else self._format_complexity(log_b_a)
             explanation = f"Teorema Maestro Caso 1: f(n) < n^{log_b_a:.2f}"
-        elif abs(c - log_b_a) < epsilon:
-            if c == 0:
-                complexity = "log n"
-            elif c == 1:
-                complexity = "n log n"
-            else:
-                complexity = f"n^{int(c)} log n"
+        elif case == 2:
+            complexity = _complexity_string('log', int(c))
             explanation = f"Teorema Maestro Caso 2: f(n) = ?(n^{log_b_a:.2f})"
         else:
-            if c == 1:
-                complexity = "n"
-            else:
-                complexity = f"n^{int(c)}"
+            complexity = _complexity_string('poly', int(c))
             explanation = f"Teorema Maestro Caso 3: f(n) > n^{log_b_a:.2f}"
 
-        return AsymptoticBound(complexity, "Θ", 0.95, explanation)
+        return AsymptoticBound(complexity, _THETA, 0.95, explanation)
 
     def _apply_substitution(self, rec: RecurrenceEquation) -> AsymptoticBound:
-        a = rec.a if rec.a else 1
+        a = rec.a or 1
         if a == 1:
             complexity = "n"
             explanation = "Sustitucion: T(n) = T(n-1) + c se expande a n*c"
         else:
-            complexity = f"{a}^n"
+            complexity = _complexity_string('exp', a)
             explanation = f"Sustitucion: T(n) = {a}T(n-1) + c se expande a {a}^n"
-        return AsymptoticBound(complexity, "Θ", 0.95, explanation)
+        return AsymptoticBound(complexity, _THETA, 0.95, explanation)
 
     def _apply_tree_method(self, rec: RecurrenceEquation) -> AsymptoticBound:
-        equation = rec.equation
-        if "T(n-1) + T(n-2)" in equation:
-            complexity = "2^n"
+        a = rec.a
+        if rec.pattern == Pattern.FIB:
+            complexity = _complexity_string('exp', 2)
             explanation = "Metodo del arbol: Ramificacion binaria ~ 2^n ~ ?(2^n)"
-        elif rec.a and rec.a > 1:
-            complexity = f"{rec.a}^n"
-            explanation = f"Metodo del arbol: Ramificacion {rec.a} da ?({rec.a}^n)"
+        elif a and a > 1:
+            complexity = _complexity_string('exp', a)
+            explanation = f"Metodo del arbol: Ramificacion {a} da ?({a}^n)"
         else:
             complexity = "n"
             explanation = "Metodo del arbol: Profundidad lineal de recursion"
-        return AsymptoticBound(complexity, "Θ", 0.90, explanation)
+        return AsymptoticBound(complexity, _THETA, 0.90, explanation)
 
     def _analyze_loops(self, rec: RecurrenceEquation) -> AsymptoticBound:
-        equation = rec.equation
-        if "n^" in equation:
-            match = re.search(r'n\^(\d+)', equation)
-            complexity = f"n^{match.group(1)}" if match else "n"
+        equation, hint = rec.equation, rec.complexity_hint
+        if hint is not None:
+            complexity = hint
+        elif "n^" in equation:
+            match = _RE_NPOW.search(equation)
+            complexity = _complexity_string('poly', int(match.group(1))) if match else "n"
         elif "cn" in equation or "T(n) = n" in equation:
             complexity = "n"
         else:
             complexity = "1"
-        return AsymptoticBound(complexity, "Θ", 0.95, "Analisis de bucles: Determinado a partir de la estructura de iteracion")
+        return AsymptoticBound(complexity, _THETA, 0.95, "Analisis de bucles: Determinado a partir de la estructura de iteracion")
+
+    # Resolutores indexados por Method (el orden debe coincidir con sus valores)
+    _SOLVERS = (_apply_master_theorem, _apply_substitution, _apply_tree_method, _analyze_loops)
 
     def _format_complexity(self, value: float) -> str:
         if abs(value - round(value)) < 0.01:
-            int_val = int(round(value))
-            if int_val == 0:
-                return "1"
-            elif int_val == 1:
-                return "n"
-            else:
-                return f"n^{int_val}"
+            return _complexity_string('poly', int(round(value)))
         else:
             return f"n^{value:.2f}"
 
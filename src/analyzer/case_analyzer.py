@@ -13,23 +13,115 @@ Classes:
 - CaseAnalyzer: Analiza diferentes casos de complejidad
 """
 
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, TextIO, Tuple, Any
+from collections.abc import Mapping as MappingABC
+from dataclasses import dataclass, field, fields, is_dataclass
+from functools import lru_cache, partial
+from types import MappingProxyType
 import sys
 import os
+import re
+import weakref
+from collections import OrderedDict
 
 # Asegurar que los imports funcionen
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from src.ast.nodes import (
-    Function, Call, For, While, If, Return,
-    Assignment, BinOp, Number, Var
+    Node, Program, Function, Call, For, While, If, Repeat, Return,
+    Assignment, BinOp, Number, Var, Condition, ArrayAccess, MatrixAccess,
+    ArrayDeclaration, MatrixDeclaration, BoolOp, UnaryOp, Boolean
 )
 
 
-@dataclass
+# Atributos que pueden contener nodos hijos, por tipo de nodo.
+# Se listan en orden alfabético para recorrer los hijos en el mismo orden que dir().
+# Están todos los tipos de src.ast.nodes; las hojas se declaran sin atributos hijos.
+_CHILDREN = {
+    Program: ('functions',),
+    Function: ('body',),
+    For: ('body', 'end', 'start'),
+    While: ('body', 'condition'),
+    If: ('condition', 'else_body', 'then_body'),
+    Repeat: ('body', 'condition'),
+    Call: ('args',),
+    Return: ('expr',),
+    Assignment: ('expr', 'name'),
+    BinOp: ('left', 'right'),
+    Condition: ('left', 'right'),
+    ArrayAccess: ('index',),
+    MatrixAccess: ('col_index', 'row_index'),
+    ArrayDeclaration: ('size',),
+    MatrixDeclaration: ('cols', 'rows'),
+    BoolOp: ('left', 'right'),
+    UnaryOp: ('operand',),
+    Var: (),
+    Number: (),
+    Boolean: (),
+}
+
+
+@lru_cache(maxsize=128)
+def _declared_child_fields(node_type: type) -> Optional[Tuple[str, ...]]:
+    """
+    Campos declarados por la clase (dataclass) de un Node fuera de _CHILDREN, memorizados
+    por clase sin tocar la tabla; None si la clase no los declara.
+    """
+    if not is_dataclass(node_type):
+        return None
+    return tuple(sorted(f.name for f in fields(node_type) if not f.name.startswith('_')))
+
+
+def _child_fields(node) -> Tuple[str, ...]:
+    """
+    Atributos con posibles hijos para el tipo del nodo. Un Node de un tipo que no está en
+    _CHILDREN usa los campos que declara su clase; si no los declara, se inspecciona con
+    vars() en cada visita (otra instancia del mismo tipo puede tener otros atributos).
+    Cualquier otro objeto no tiene hijos.
+    """
+    node_type = type(node)
+    child_fields = _CHILDREN.get(node_type)
+    if child_fields is not None:
+        return child_fields
+    if isinstance(node, Node):
+        child_fields = _declared_child_fields(node_type)
+        if child_fields is None:
+            child_fields = tuple(sorted(name for name in vars(node) if not name.startswith('_')))
+        return child_fields
+    return ()
+
+
+def _iter_children(node):
+    """Itera los nodos hijos directos de un nodo del AST (sin inspeccionar dir())."""
+    for field in _child_fields(node):
+        value = getattr(node, field, None)
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, Node):
+                    yield item
+        elif isinstance(value, Node):
+            yield value
+
+
+def _walk(node):
+    """Recorre el AST en preorden con una pila explícita, sin recursión de Python."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        children = list(_iter_children(current))
+        children.reverse()
+        stack.extend(children)
+
+
+# Nombre típico de Fibonacci (fib, fibo, fibonacci...), sin crear la versión en minúsculas
+_FIB_RE = re.compile(r'fib', re.IGNORECASE)
+_PIVOT_RE = re.compile(r'pivot', re.IGNORECASE)  # cubre también 'pivote'
+
+
+@dataclass(slots=True, frozen=True)
 class CaseAnalysis:
-    """Representa el análisis de un caso específico."""
+    """Representa el análisis de un caso específico (inmutable, se puede compartir entre llamadas)."""
     case_type: str  # 'best', 'worst', 'average'
     complexity: str
     scenario: str  # Descripción del escenario
@@ -37,6 +129,566 @@ class CaseAnalysis:
     explanation: str  # Explicación detallada
 
 
+class LazyCases(MappingABC):
+    """
+    Vista de sólo lectura con los casos 'best', 'worst' y 'average'.
+    Cada caso se construye la primera vez que se lee; se comporta como un dict de CaseAnalysis.
+    """
+    __slots__ = ('_builders', '_cache')
+
+    def __init__(self, builders: Dict[str, Callable[[], "CaseAnalysis"]]):
+        self._builders = builders
+        self._cache: Dict[str, CaseAnalysis] = {}
+
+    def __getitem__(self, key: str) -> "CaseAnalysis":
+        case = self._cache.get(key)
+        if case is None:
+            case = self._cache[key] = self._builders[key]()
+        return case
+
+    def __iter__(self):
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+    @property
+    def best(self) -> "CaseAnalysis":
+        return self['best']
+
+    @property
+    def worst(self) -> "CaseAnalysis":
+        return self['worst']
+
+    @property
+    def average(self) -> "CaseAnalysis":
+        return self['average']
+
+
+@dataclass(slots=True)
+class FunctionFeatures:
+    """Rasgos estructurales de una función, obtenidos en el recorrido único del AST."""
+    name: str
+    recursive_calls: int = 0       # Llamadas a sí misma
+    fib_decrements: bool = False   # Alguna llamada recibe argumentos n-1 y n-2
+    has_binary_div: bool = False   # Asignación con división binaria (x = (...) / 2)
+
+
+@dataclass(slots=True)
+class AstFeatures:
+    """Rasgos estructurales de un AST completo, calculados en una sola pasada."""
+    is_program: bool = False
+    functions: List[FunctionFeatures] = field(default_factory=list)
+    has_loops: bool = False
+    max_loop_depth: int = 0
+    early_return_in_loop: bool = False
+    saw_pivot_identifier: bool = False  # algún Var tipo 'pivot' / 'pivote' en todo el árbol
+
+    @property
+    def func_name(self) -> str:
+        return self.functions[0].name if self.functions else ""
+
+    @property
+    def has_recursion(self) -> bool:
+        return any(f.recursive_calls for f in self.functions)
+
+    @property
+    def has_divide_conquer(self) -> bool:
+        return any(f.recursive_calls >= 2 for f in self.functions)
+
+    @property
+    def has_binary_search(self) -> bool:
+        return self.is_program and any(f.has_binary_div for f in self.functions)
+
+    @property
+    def is_fibonacci(self) -> bool:
+        if not self.is_program:
+            return False
+        for f in self.functions:
+            if f.recursive_calls != 2:
+                continue
+            # Con nombre típico basta; si no, se exige el patrón de decrementos n-1 / n-2
+            if _FIB_RE.search(f.name) or f.fib_decrements:
+                return True
+        return False
+
+
+@dataclass(slots=True, frozen=True)
+class _CallContext:
+    """Datos de una llamada a analyze_all_cases que comparten los constructores de casos."""
+    func_name: str = "algoritmo"
+    func_name_lower: str = ""
+    features: Optional[AstFeatures] = None
+    complexity: str = ""
+    recurrence: str = ""
+
+
+# Plantillas de casos: (complejidad, usa_cota_matemática, escenario, ejemplo, explicación).
+# Si usa_cota_matemática es True, la complejidad recibida del motor matemático tiene prioridad.
+# El ejemplo admite {name} con el nombre de la función analizada.
+_BEST_CASES_TMPL = {
+    "fibonacci": (
+        "Θ(2ⁿ)", True,
+        "Para n > 1 el árbol recursivo completo siempre se genera; no hay entradas “más fáciles”.",
+        "{name}(n) con n > 1 ejecuta siempre el mismo patrón de llamadas.",
+        "Fibonacci recursivo sin memoización es determinista: para cada n > 1 el número de llamadas está fijado. "
+        "Asintóticamente, mejor, peor y promedio coinciden en Θ(2ⁿ). Para n = 0 o n = 1 el coste se reduce a Θ(1).",
+    ),
+    "binary_search": (
+        "Θ(1)", False,
+        "El elemento buscado está exactamente en la posición central en la primera comparación.",
+        "{name}([1,2,3,4,5], 3) → se encuentra en la primera comparación.",
+        "En el mejor caso la búsqueda binaria termina tras una sola comparación.",
+    ),
+    "prime_test": (
+        "Θ(1)", False,
+        "Se detecta un caso trivial (n ≤ 1) o un divisor muy pequeño en la primera iteración.",
+        "{name}(1), {name}(0) o {name}(4) → se devuelve enseguida.",
+        "El mejor caso ocurre cuando se sale por el caso base n ≤ 1 o cuando el primer divisor probado "
+        "divide a n (por ejemplo i = 2 en un bucle que prueba divisores).",
+    ),
+    "recursive": (
+        "Θ(n)", True,
+        "Recursión determinista sin ramas de salida temprana dependientes de los datos.",
+        "{name}(n) recorre siempre la misma profundidad de recursión para ese n (como factorial).",
+        "Cuando la recursión sólo depende del parámetro de tamaño (ej. factorial), "
+        "todas las entradas de tamaño n inducen el mismo trabajo. "
+        "Asintóticamente, la mejor cota coincide con la peor y la promedio.",
+    ),
+    # Algoritmos divide & conquer tipo MergeSort / QuickSort
+    "divide_conquer": (
+        "Θ(n log n)", False,
+        "La estrategia divide-y-vencerás se aplica con particiones razonablemente balanceadas.",
+        "{name}(n) realiza ~log₂(n) niveles de división con trabajo lineal por nivel.",
+        "En algoritmos como MergeSort y QuickSort (con pivote razonable), el número de niveles es O(log n) "
+        "y cada nivel hace trabajo O(n), dando lugar a Θ(n log n) incluso en el mejor caso asintótico.",
+    ),
+    # Bucles anidados sin early break: mejor caso = mismo orden que el peor
+    "nested_loops": (
+        "Θ(n²)", True,
+        "Bucles anidados sin corte anticipado; los rangos se recorren completos.",
+        "Triple bucle, multiplicación de matrices, bubble_sort sin optimizaciones.",
+        "Si no hay break / return de salida temprana, el número de iteraciones de los bucles anidados "
+        "depende sólo de n. El mejor caso es del mismo orden que el peor.",
+    ),
+    "linear_search": (
+        "Θ(1)", False,
+        "El elemento buscado aparece en la primera posición o la estructura está vacía.",
+        "buscar_lineal([5,2,3], 5) → encontrado en el índice 0.",
+        "La búsqueda lineal puede terminar tras revisar únicamente el primer elemento.",
+    ),
+    "linear_processing": (
+        "Θ(n)", True,
+        "El algoritmo debe procesar todos los elementos sin posibilidad de cortar antes.",
+        "{name}(n) → recorre todos los elementos (por ejemplo, suma de un arreglo).",
+        "En algoritmos de procesamiento puro (suma, acumulación, transformación), "
+        "no hay condición de salida temprana: siempre se recorre toda la entrada.",
+    ),
+    "constant": (
+        "Θ(1)", False,
+        "Operación directa sin iteraciones ni recursión.",
+        "asignación simple, acceso a una posición de un arreglo.",
+        "El tiempo de ejecución no depende del tamaño de la entrada.",
+    ),
+}
+
+_DEFAULT_BEST = (
+    "Θ(1)", True,
+    "Caso base o condición trivial.",
+    "N/A",
+    "Mejor escenario posible de ejecución.",
+)
+
+_WORST_CASES_TMPL = {
+    # nested_loops: el peor caso es exactamente la cota que dio el motor matemático
+    "nested_loops": (
+        "Θ(n²)", True,
+        "Todos los bucles anidados recorren su rango completo.",
+        "bubble_sort con arreglo invertido; triple bucle sobre n.",
+        "El motor matemático determinó la expresión de coste y su orden dominante; "
+        "el peor caso coincide con esa cota (por ejemplo Θ(n²), Θ(n³), etc.).",
+    ),
+    "recursive": (
+        "Θ(n)", True,
+        "Profundidad de recursión máxima para entradas de tamaño n.",
+        "{name}(n) recursivo sin poda ni memoización.",
+        "La cota asintótica del peor caso coincide con la que devuelve el motor matemático "
+        "(por ejemplo Θ(n) para factorial, Θ(2ⁿ) para recursiones exponenciales).",
+    ),
+    "fibonacci": (
+        "Θ(2ⁿ) ≈ Θ(2ⁿ)", False,
+        "Cualquier valor n > 1 (el algoritmo es determinista).",
+        "{name}(10) genera ~2¹⁰ ≈ 1024 llamadas recursivas en un árbol binario.",
+        "Fibonacci recursivo sin memoización SIEMPRE es exponencial. La base exacta es 2≈1.618, "
+        "pero O(2ⁿ) es la cota superior estándar. No hay 'mejor o peor entrada', sólo depende de n.",
+    ),
+    "prime_test": (
+        "Θ(n)", False,
+        "n es primo o no tiene divisores pequeños; el bucle recorre todos los candidatos.",
+        "{name}(p) donde p es primo grande → se prueban todos los i desde 2 hasta n-1.",
+        "En el peor caso se comprueban todos los posibles divisores hasta n-1, "
+        "lo que implica un número lineal de iteraciones en n.",
+    ),
+    "binary_search": (
+        "Θ(log n)", False,
+        "El elemento no está en el arreglo o está en una posición que requiere todas las divisiones.",
+        "{name}([1,2,3,4,5,6,7,8], 9) → log₂(8) divisiones hasta espacio vacío.",
+        "La búsqueda binaria divide el espacio de búsqueda a la mitad en cada paso. "
+        "En el peor caso necesita Θ(log n) comparaciones.",
+    ),
+    "linear_search": (
+        "Θ(n)", False,
+        "Elemento al final del arreglo o no encontrado.",
+        "buscar_lineal([1,2,3,4,5], 5) → n comparaciones.",
+        "Se recorre toda la estructura hasta el final.",
+    ),
+    "linear_processing": (
+        "Θ(n)", True,
+        "El algoritmo debe procesar todos los elementos (sin salida temprana).",
+        "{name}(n) → procesa exactamente n elementos.",
+        "Algoritmos de procesamiento deben completar todas las iteraciones. "
+        "El 'peor caso' coincide con el 'mejor caso' porque no hay optimización posible.",
+    ),
+    "constant": (
+        "Θ(1)", False,
+        "Operación directa sin iteraciones ni recursión.",
+        "suma = a + b.",
+        "Tiempo constante independiente del tamaño de entrada.",
+    ),
+}
+
+# divide_conquer: QuickSort (pivote desbalanceado) frente a MergeSort
+_WORST_QUICKSORT = (
+    "Θ(n²)", False,
+    "Particiones extremadamente desbalanceadas (pivote siempre el mínimo o máximo).",
+    "{name} sobre un arreglo ya ordenado usando siempre el primer elemento como pivote.",
+    "En QuickSort, si el pivote parte el arreglo en 1 y n-1 elementos en cada llamada, "
+    "se obtiene la recurrencia T(n) = T(n-1) + O(n), cuya solución es Θ(n²).",
+)
+
+_WORST_MERGESORT = (
+    "Θ(n log n)", True,
+    "División razonablemente balanceada en cada nivel de recursión.",
+    "{name}(n) tipo MergeSort con particiones en mitades.",
+    "Cuando la estrategia de división no depende adversamente de la distribución de datos, "
+    "la recurrencia T(n) = 2T(n/2) + O(n) se resuelve como Θ(n log n).",
+)
+
+_DEFAULT_WORST = (
+    "Θ(n)", True,
+    "Peor escenario de ejecución.",
+    "N/A",
+    "Máximo número de operaciones requeridas.",
+)
+
+_AVERAGE_CASES_TMPL = {
+    "fibonacci": (
+        "Θ(2ⁿ) ≈ Θ(2ⁿ)", False,
+        "Cualquier valor n > 1 (no depende de los datos, solo de n).",
+        "{name}(n) siempre genera ~2ⁿ llamadas, donde 2 = 1.618...",
+        "Fibonacci recursivo es determinista: para un n dado, siempre ejecuta la misma cantidad de operaciones. "
+        "No tiene 'caso promedio' en el sentido tradicional porque no depende de la disposición de datos.",
+    ),
+    "binary_search": (
+        "Θ(log n)", False,
+        "El elemento buscado está en una posición aleatoria del arreglo ordenado o puede no estar.",
+        "En promedio se realizan ~log₂(n) comparaciones.",
+        "Cada comparación descarta la mitad del espacio; para claves aleatorias o presencia/ausencia "
+        "aleatoria, el número esperado de pasos es proporcional a log n.",
+    ),
+    "prime_test": (
+        "Θ(n)", False,
+        "n es un entero cualquiera, sin sesgo especial hacia primos o compuestos fáciles.",
+        "En promedio se comprueba una fracción de los posibles divisores antes de encontrar uno o concluir primalidad.",
+        "Aunque muchas entradas compuestas se descartan antes de probar todos los divisores, "
+        "asintóticamente la cantidad esperada de iteraciones sigue siendo lineal en n.",
+    ),
+    "divide_conquer": (
+        "Θ(n log n)", False,
+        "Datos de entrada distribuidos aleatoriamente.",
+        "{name} con pivotes aleatorios o divisiones razonablemente balanceadas.",
+        "En promedio, los algoritmos divide & conquer mantienen Θ(n log n). "
+        "QuickSort con pivotes aleatorios evita el peor caso Θ(n²); MergeSort siempre es Θ(n log n).",
+    ),
+    "recursive": (
+        "Θ(n)", True,
+        "Depende del tipo de recursión: lineal (una llamada) o exponencial (múltiples).",
+        "Recursión lineal: {name}(n) hace n llamadas; recursión exponencial: árbol de llamadas completo.",
+        "La complejidad promedio depende de la estructura: lineal T(n)=T(n-1)+c es Θ(n), "
+        "exponencial sin memoización es Θ(2ⁿ).",
+    ),
+    "nested_loops": (
+        "Θ(n²)", True,
+        "Datos de entrada aleatorios sin cambios en los límites de los bucles.",
+        "Ordenamientos y algoritmos con bucles anidados que siempre recorren sus rangos completos.",
+        "Si los límites de los bucles no dependen de la distribución de datos, "
+        "el caso promedio tiene el mismo orden que el peor y el mejor caso.",
+    ),
+    "linear_search": (
+        "Θ(n/2) = Θ(n)", False,
+        "Elemento en posición aleatoria.",
+        "buscar_lineal → elemento en mitad del arreglo en promedio.",
+        "En promedio, se recorre la mitad de la estructura.",
+    ),
+    "linear_processing": (
+        "Θ(n)", True,
+        "El algoritmo procesa todos los elementos independientemente de sus valores.",
+        "{name}(n) → siempre procesa n elementos.",
+        "No existe variación relevante en el caso promedio: el algoritmo procesa todos los elementos "
+        "independientemente de su contenido.",
+    ),
+    "constant": (
+        "Θ(1)", False,
+        "Operación directa.",
+        "Asignación o acceso directo.",
+        "Tiempo constante siempre.",
+    ),
+}
+
+_DEFAULT_AVERAGE = (
+    "Θ(n)", True,
+    "Caso promedio de ejecución.",
+    "N/A",
+    "Complejidad esperada para datos aleatorios.",
+)
+
+
+# Casos puramente matemáticos (sin patrón estructural): textos fijos, sólo varían cota y ecuación
+_MATH_UNKNOWN_COMPLEXITY = "No determinado"
+_MATH_UNKNOWN_RECURRENCE = "no disponible"
+_MATH_BEST_SCENARIO = "Entrada más favorable admitida por la cota matemática."
+_MATH_WORST_SCENARIO = "Entrada que fuerza el máximo número de operaciones según la cota matemática."
+_MATH_AVERAGE_SCENARIO = "Entrada típica; sin patrón estructural se asume el mismo orden que la cota."
+_MATH_EJEMPLO = "N/A (no se reconoció un patrón algorítmico concreto)."
+_MATH_EXPL_TEMPL = (
+    "La cota proviene del análisis matemático, sin distinguir entradas favorables o adversas.\n"
+    "Ecuación utilizada: %s"
+)
+
+# Patrones de _validate_and_refine_type (la recurrencia llega sin espacios, la complejidad en minúsculas).
+# Una unión con grupos nombrados por cadena; cada coincidencia se despacha por lastgroup.
+_REC_RE = re.compile(r't\(n-(?:(?P<n1>1)|(?P<n2>2))\)|(?P<half>t\(n/2\))')
+_COMP_RE = re.compile(r'(?P<nlogn>n\s*\*?\s*log)|(?P<log>log)|(?P<exp>2\s*(?:\^|\*\*)|exp\()')
+
+# Huella de recurrencia/complejidad como máscara de bits (un bit por patrón detectado)
+_TOK_N1 = 1 << 0          # T(n-1) en la recurrencia
+_TOK_N2 = 1 << 1          # T(n-2) en la recurrencia
+_TOK_HALF = 1 << 2        # T(n/2) en la recurrencia
+_TOK_LOG = 1 << 3         # complejidad con log
+_TOK_NOT_PURE_LOG = 1 << 4
+_TOK_NLOG = 1 << 5
+_TOK_EXP = 1 << 6
+_TOK_BITS = 7
+# Rasgos del AST que algunas reglas consultan
+_AST_BSEARCH = 1 << 7     # división binaria del espacio de búsqueda
+_AST_MULTI = 1 << 8       # al menos 2 llamadas recursivas activas
+_AST_BITS = _AST_BSEARCH | _AST_MULTI
+
+# Bits que aporta cada grupo: n log n y exponencial no son logarítmicas puras
+_GROUP_BITS = {
+    'n1': _TOK_N1,
+    'n2': _TOK_N2,
+    'half': _TOK_HALF,
+    'nlogn': _TOK_LOG | _TOK_NOT_PURE_LOG | _TOK_NLOG,
+    'log': _TOK_LOG,
+    'exp': _TOK_EXP | _TOK_NOT_PURE_LOG,
+}
+
+
+def _fingerprint(recurrence: str, complexity_low: str) -> int:
+    """Una pasada de cada unión sobre recurrencia y complejidad; devuelve la máscara de tokens."""
+    mask = 0
+    for match in _REC_RE.finditer(recurrence):
+        mask |= _GROUP_BITS[match.lastgroup]
+    for match in _COMP_RE.finditer(complexity_low):
+        mask |= _GROUP_BITS[match.lastgroup]
+    return mask
+
+
+def _refine_rule(mask: int) -> Optional[str]:
+    """Reglas de _validate_and_refine_type en orden de prioridad; None conserva el tipo detectado."""
+    # Fibonacci / exponencial: T(n-1) y T(n-2)
+    if mask & _TOK_N1 and mask & _TOK_N2:
+        return "fibonacci"
+    # Búsqueda binaria: T(n/2) con complejidad logarítmica pura
+    if mask & _TOK_HALF and mask & _TOK_LOG and not mask & _TOK_NOT_PURE_LOG:
+        return "binary_search"
+    if mask & _AST_BSEARCH:
+        return "binary_search"
+    # Divide & conquer general (merge sort, quick sort bueno, etc.)
+    if mask & _TOK_NLOG:
+        return "divide_conquer"
+    # Exponencial general: si el AST es fibonacciesco aunque el nombre no lo diga
+    if mask & _TOK_EXP:
+        return "fibonacci" if mask & _AST_MULTI else "recursive"
+    return None
+
+
+# Tabla de saltos precalculada sobre todas las huellas posibles
+_RULE_TABLE = {mask: rule for mask in range(1 << (_TOK_BITS + 2))
+               if (rule := _refine_rule(mask)) is not None}
+# Huellas de texto cuyo resultado depende de los rasgos del AST (sólo entonces se consultan)
+_NEEDS_AST = frozenset(
+    mask for mask in range(1 << _TOK_BITS)
+    if len({_RULE_TABLE.get(mask | bits) for bits in (0, _AST_BSEARCH, _AST_MULTI, _AST_BITS)}) > 1
+)
+
+
+# Separadores del resumen comparativo
+_SEP_EQ = "═" * 70
+_SEP_HV = "━" * 70
+
+# Nombres de caso ya en mayúsculas (vocabulario fijo; otros nombres se convierten al vuelo)
+_CASE_NAMES_UPPER = {name: name.upper() for name in ('best', 'worst', 'average')}
+
+# Bloque de un caso: una sola llamada a format en lugar de varias f-strings
+_CASE_TEMPLATE = (
+    _SEP_HV + "\n"
+    "{name} CASO ({ctype})\n"
+    + _SEP_HV + "\n"
+    "📊 Complejidad:  {complexity}\n"
+    "📋 Escenario:    {scenario}\n"
+    "💡 Ejemplo:      {ejemplo}\n"
+    "📖 Explicación:  {explanation}\n\n"
+)
+
+
+@lru_cache(maxsize=64)
+def _format_case_block(case_name: str, analysis: "CaseAnalysis") -> str:
+    """Bloque de texto de un caso en el resumen comparativo (CaseAnalysis es inmutable y hashable)."""
+    return _CASE_TEMPLATE.format(
+        name=_CASE_NAMES_UPPER.get(case_name) or case_name.upper(),
+        ctype=_CASE_NAMES_UPPER.get(analysis.case_type) or analysis.case_type.upper(),
+        complexity=analysis.complexity,
+        scenario=analysis.scenario,
+        ejemplo=analysis.ejemplo,
+        explanation=analysis.explanation,
+    )
+
+
+def _iter_summary_parts(cases: Mapping[str, "CaseAnalysis"]):
+    """Fragmentos del resumen comparativo, en orden, para unir o escribir en un stream."""
+    yield _SEP_EQ + "\n"
+    yield "ANÁLISIS COMPARATIVO DE CASOS\n"
+    yield _SEP_EQ + "\n\n"
+    for case_name, analysis in cases.items():
+        yield _format_case_block(case_name, analysis)
+    yield _SEP_EQ + "\n"
+
+
+@lru_cache(maxsize=256)
+def _build_math_based_cases_cached(recurrence_eq: str, complexity: str) -> Mapping[str, "CaseAnalysis"]:
+    """
+    Casos construidos sólo con la información matemática disponible (recurrencia y cota).
+    Los tres casos comparten la misma cota: sin patrón estructural no hay base para separarlos.
+    Función pura: el resultado es una vista inmutable compartida por todas las llamadas.
+    """
+    comp = complexity or _MATH_UNKNOWN_COMPLEXITY
+    explanation = _MATH_EXPL_TEMPL % (recurrence_eq or _MATH_UNKNOWN_RECURRENCE)
+    return MappingProxyType({
+        'best': CaseAnalysis('best', comp, _MATH_BEST_SCENARIO, _MATH_EJEMPLO, explanation),
+        'worst': CaseAnalysis('worst', comp, _MATH_WORST_SCENARIO, _MATH_EJEMPLO, explanation),
+        'average': CaseAnalysis('average', comp, _MATH_AVERAGE_SCENARIO, _MATH_EJEMPLO, explanation),
+    })
+
+
+def _functions(ast) -> Tuple[Function, ...]:
+    """Funciones del programa como tupla; vacía si el AST no es un Program (o no tiene funciones)."""
+    funcs = getattr(ast, 'functions', None)
+    return tuple(funcs) if funcs else ()
+
+
+def _ast_context(ast, funcs: Optional[Tuple[Function, ...]] = None,
+                 features: Optional[AstFeatures] = None,
+                 complexity: str = "", recurrence: str = "") -> _CallContext:
+    """Contexto de la llamada: nombre de la primera función (y en minúsculas, calculado una vez)."""
+    if funcs is None:
+        funcs = _functions(ast)
+    if not funcs:
+        return _CallContext(features=features, complexity=complexity, recurrence=recurrence)
+    name = funcs[0].name
+    return _CallContext(name, name.lower(), features, complexity, recurrence)
+
+
+def _case_from_template(case_type: str, tmpl: Tuple, comp: str, func_name: str) -> "CaseAnalysis":
+    """Construye el único CaseAnalysis pedido a partir de su plantilla."""
+    complexity, follows_math, scenario, ejemplo, explanation = tmpl
+    if not (follows_math and comp):
+        # Plantilla sin datos de entrada: se devuelve la instancia compartida
+        shared = _SHARED_CASES.get((case_type, tmpl))
+        if shared is not None:
+            return shared
+    return CaseAnalysis(
+        case_type=case_type,
+        complexity=(comp or complexity) if follows_math else complexity,
+        scenario=scenario,
+        ejemplo=ejemplo.format(name=func_name),
+        explanation=explanation,
+    )
+
+
+def _build_shared_cases() -> Dict[Tuple[str, Tuple], "CaseAnalysis"]:
+    """Instancias únicas para las plantillas cuyo ejemplo no depende del nombre de la función."""
+    groups = (
+        ("best", list(_BEST_CASES_TMPL.values()) + [_DEFAULT_BEST]),
+        ("worst", list(_WORST_CASES_TMPL.values()) + [_WORST_QUICKSORT, _WORST_MERGESORT, _DEFAULT_WORST]),
+        ("average", list(_AVERAGE_CASES_TMPL.values()) + [_DEFAULT_AVERAGE]),
+    )
+    shared = {}
+    for case_type, templates in groups:
+        for tmpl in templates:
+            complexity, _, scenario, ejemplo, explanation = tmpl
+            if "{name}" not in ejemplo:
+                shared[case_type, tmpl] = CaseAnalysis(case_type, complexity, scenario, ejemplo, explanation)
+    return shared
+
+
+# CaseAnalysis es inmutable, así que estas instancias se comparten entre llamadas
+_SHARED_CASES = _build_shared_cases()
+
+
+# Constructores de casos a nivel de módulo: los casos perezosos memorizados sólo guardan el
+# tipo y el contexto, sin referencias al CaseAnalyzer dueño de la caché.
+
+def _best_case(algorithm_type: str, ctx: _CallContext) -> CaseAnalysis:
+    """Mejor caso para el tipo de algoritmo y el contexto de la llamada."""
+    try:
+        tmpl = _BEST_CASES_TMPL[algorithm_type]
+    except KeyError:
+        tmpl = _DEFAULT_BEST  # compartido e inmutable
+    return _case_from_template("best", tmpl, ctx.complexity, ctx.func_name)
+
+
+def _worst_case(algorithm_type: str, ctx: _CallContext) -> CaseAnalysis:
+    """Peor caso para el tipo de algoritmo y el contexto de la llamada."""
+    # divide_conquer: diferenciamos entre MergeSort y QuickSort aproximando via AST
+    if algorithm_type == "divide_conquer":
+        # Heurística simple: si el nombre de la función o variables contienen 'quick' o 'pivot',
+        # asumimos QuickSort (peor caso n²); en otro caso, MergeSort-like (n log n).
+        func_lower = ctx.func_name_lower
+        is_quick = ("quick" in func_lower or "qsort" in func_lower
+                    # Identificadores tipo 'pivot' / 'pivote' en el AST (rasgos del contexto)
+                    or (ctx.features is not None and ctx.features.saw_pivot_identifier))
+
+        tmpl = _WORST_QUICKSORT if is_quick else _WORST_MERGESORT
+        return _case_from_template("worst", tmpl, ctx.complexity, ctx.func_name)
+
+    try:
+        tmpl = _WORST_CASES_TMPL[algorithm_type]
+    except KeyError:
+        tmpl = _DEFAULT_WORST  # compartido e inmutable
+    return _case_from_template("worst", tmpl, ctx.complexity, ctx.func_name)
+
+
+def _average_case(algorithm_type: str, ctx: _CallContext) -> CaseAnalysis:
+    """Caso promedio para el tipo de algoritmo y el contexto de la llamada."""
+    try:
+        tmpl = _AVERAGE_CASES_TMPL[algorithm_type]
+    except KeyError:
+        tmpl = _DEFAULT_AVERAGE  # compartido e inmutable
+    return _case_from_template("average", tmpl, ctx.complexity, ctx.func_name)
+
+
 class CaseAnalyzer:
     """
     Analiza el mejor, peor y caso promedio de algoritmos.
@@ -45,29 +697,62 @@ class CaseAnalyzer:
     estructuras algorítmicas.
     """
     
-    def __init__(self):
-        """Inicializa el analizador de casos."""
-        self.analysis_cache: Dict[str, Dict[str, CaseAnalysis]] = {}
+    def __init__(self, cache_size: int = 128):
+        """Inicializa el analizador de casos con una caché LRU de cache_size entradas."""
+        self.cache_size = cache_size
+        # (id(ast), tipo, recurrencia, complejidad) -> (referencia débil al AST, casos).
+        # La referencia débil evita retener el árbol y detecta ids reutilizados tras liberarlo.
+        self.analysis_cache: "OrderedDict[Tuple, Tuple[weakref.ref, Mapping[str, CaseAnalysis]]]" = OrderedDict()
+        self._features_cache: "weakref.WeakKeyDictionary[Node, AstFeatures]" = weakref.WeakKeyDictionary()
     
     def analyze_all_cases(self, ast, algorithm_type: str = 'unknown', 
-                      recurrence_eq: str = None, complexity: str = None) -> Dict[str, CaseAnalysis]:
+                      recurrence_eq: str = None, complexity: str = None) -> Mapping[str, CaseAnalysis]:
         """
         Analiza todos los casos (mejor, peor, promedio) de un algoritmo.
+        El resultado se memoriza por AST y argumentos; repetir la llamada no recorre el árbol.
+        """
+        # Sin información matemática el resultado no depende del AST: ni se detecta ni se recorre
+        if not complexity and not recurrence_eq:
+            return self._build_math_based_cases(recurrence_eq, complexity)
+
+        if not isinstance(ast, Node):
+            return self._compute_all_cases(ast, algorithm_type, recurrence_eq, complexity)
+
+        key = (id(ast), algorithm_type, recurrence_eq, complexity)
+        cached = self.analysis_cache.get(key)
+        if cached is not None and cached[0]() is ast:
+            self.analysis_cache.move_to_end(key)
+            return cached[1]
+
+        cases = self._compute_all_cases(ast, algorithm_type, recurrence_eq, complexity)
+        self.analysis_cache[key] = (weakref.ref(ast), cases)
+        self.analysis_cache.move_to_end(key)
+        if len(self.analysis_cache) > self.cache_size:
+            self.analysis_cache.popitem(last=False)
+        return cases
+
+    def clear_cache(self):
+        """Vacía las cachés de casos y de rasgos del AST."""
+        self.analysis_cache.clear()
+        self._features_cache.clear()
+
+    def _compute_all_cases(self, ast, algorithm_type: str,
+                           recurrence_eq: Optional[str], complexity: Optional[str]) -> Mapping[str, CaseAnalysis]:
+        """
+        Calcula los tres casos sin pasar por la caché.
 
         Orden de prioridad:
         1) Patrón estructural en el AST (más fiable para casos concretos).
         2) Ecuación de recurrencia / complejidad matemática (para afinar tipo).
-        3) Fallback puramente matemático si no hay nada más.
+        (El fallback puramente matemático, sin recurrencia ni complejidad, lo resuelve analyze_all_cases.)
         """
-        func_name = ""
-        if hasattr(ast, 'functions') and ast.functions:
-            func_name = ast.functions[0].name.lower()
-        elif hasattr(ast, 'name'):
-            func_name = str(ast.name).lower()
+        funcs = _functions(ast)
 
         # --- 1) Siempre intentamos detectar el tipo desde el AST ---
         detected_type = 'unknown'
+        features = None
         try:
+            features = self._extract_features(ast)
             detected_type = self._detect_algorithm_type(ast)
         except Exception:
             pass
@@ -84,30 +769,28 @@ class CaseAnalyzer:
                     algorithm_type,
                     rec_str,
                     comp_str,
-                    ast
+                    ast,
+                    funcs
                 )
         except Exception:
             # Si algo falla en el refinamiento, seguimos con el tipo que teníamos
             pass
 
-        # Si no tenemos nada de info matemática, usamos el fallback puramente matemático ---
-        if not complexity and not recurrence_eq:
-            return self._build_math_based_cases(recurrence_eq, complexity)
-
-        # Construir los tres casos en función del tipo que quedó ---
-        best_case = self._analyze_best_case(ast, algorithm_type, comp_str)
-        worst_case = self._analyze_worst_case(ast, algorithm_type, comp_str)
-        average_case = self._analyze_average_case(ast, algorithm_type, comp_str)
-
-        return {
-            'best': best_case,
-            'worst': worst_case,
-            'average': average_case
-        }
+        # Construir los tres casos en función del tipo que quedó (cada uno al leerlo) ---
+        # Lo único que se necesita del AST va en el contexto (rasgos y nombres, no nodos): los
+        # constructores no retienen el árbol, así que el resultado memorizado no mantiene viva
+        # su propia clave en analysis_cache.
+        ctx = _ast_context(ast, funcs, features, comp_str, rec_str)
+        return LazyCases({
+            'best': partial(_best_case, algorithm_type, ctx),
+            'worst': partial(_worst_case, algorithm_type, ctx),
+            'average': partial(_average_case, algorithm_type, ctx),
+        })
 
     
     def _validate_and_refine_type(self, detected_type: str, recurrence: str,
-                                  complexity: str, ast) -> str:
+                                  complexity: str, ast,
+                                  funcs: Optional[Tuple[Function, ...]] = None) -> str:
         """
         Valida que el tipo detectado sea coherente con la ecuación y complejidad.
         Refina el tipo si hay inconsistencias.
@@ -115,127 +798,150 @@ class CaseAnalyzer:
         recurrence = (recurrence or "").replace(" ", "")
         complexity_low = (complexity or "").lower()
 
-        # --- FIBONACCI / EXPONENCIAL ---
-        if "t(n-1)" in recurrence and "t(n-2)" in recurrence:
-            return "fibonacci"
-
-        # --- BÚSQUEDA BINARIA ---
-        # Patrones típicos:
-        #  - recurrencia con T(n/2)
-        #  - complejidad logarítmica
-        if "t(n/2)" in recurrence or "t(n/2)+o(1)" in recurrence:
-            if "log" in complexity_low and "nlog" not in complexity_low and "2^" not in complexity_low:
-                return "binary_search"
-
-        if self._has_binary_search_pattern(ast):
-            return "binary_search"
-
-        # --- DIVIDE & CONQUER GENERAL (merge sort, quick sort bueno, etc.) ---
-        if "nlog" in complexity_low or "n*log" in complexity_low:
-            return "divide_conquer"
+        # Las reglas (ver _refine_rule) están precalculadas en _RULE_TABLE por huella
+        mask = _fingerprint(recurrence, complexity_low)
+        if mask in _NEEDS_AST:
+            features = self._extract_features(ast)
+            if features.has_binary_search:
+                mask |= _AST_BSEARCH
+            if self._count_active_recursive_calls(ast, features, funcs) >= 2:
+                mask |= _AST_MULTI
 
-        # --- EXPONENCIAL GENERAL ---
-        if "2^" in complexity_low or "exp(" in complexity_low or "2" in complexity_low:
-            # Si el patrón AST es fibonacciesco pero el nombre no lo dice
-            recursive_calls = self._count_active_recursive_calls(ast)
-            if recursive_calls >= 2:
-                return "fibonacci"
-            return "recursive"
-
-        # Si nada de lo anterior aplica, nos quedamos con el tipo detectado por estructuras
-        return detected_type
+        # Si ninguna regla aplica, nos quedamos con el tipo detectado por estructuras
+        return _RULE_TABLE.get(mask, detected_type)
 
 
     
-    def _count_active_recursive_calls(self, ast) -> int:
+    def _build_math_based_cases(self, recurrence_eq: Optional[str],
+                                complexity: Optional[str]) -> Mapping[str, CaseAnalysis]:
+        """Casos construidos sólo con la información matemática (memorizados a nivel de módulo)."""
+        return _build_math_based_cases_cached(recurrence_eq or "", complexity or "")
+
+    def _count_active_recursive_calls(self, ast, features: Optional[AstFeatures] = None,
+                                      funcs: Optional[Tuple[Function, ...]] = None) -> int:
         """
         Cuenta llamadas recursivas que REALMENTE se ejecutan (no en ramas exclusivas de if).
+        Si ya se extrajeron los rasgos del AST, se reutiliza su conteo en lugar de recorrerlo.
         """
-        if hasattr(ast, 'functions') and ast.functions:
-            func = ast.functions[0]
+        if funcs is None:
+            funcs = _functions(ast)
+        if funcs:
+            if features is not None and features.functions:
+                return features.functions[0].recursive_calls
+            func = funcs[0]
             return self._count_recursive_calls(func, func.name)
         return 0
     
     def _detect_algorithm_type(self, ast) -> str:
         """Detecta el tipo de algoritmo a partir del AST."""
         
-        # Buscar patrones conocidos
-        has_recursion = self._has_recursion(ast)
-        has_loops = self._has_loops(ast)
-        has_divide_conquer = self._has_divide_conquer_pattern(ast)
-        has_binary_search = self._has_binary_search_pattern(ast)
-        is_fibonacci = self._is_fibonacci_pattern(ast)
+        # Todos los patrones salen de un único recorrido del AST
+        features = self._extract_features(ast)
         
-        if has_binary_search:
+        if features.has_binary_search:
             return 'binary_search'
-        elif is_fibonacci:
+        elif features.is_fibonacci:
             return 'fibonacci' 
-        elif has_divide_conquer:
+        elif features.has_divide_conquer:
             return 'divide_conquer'
-        elif has_recursion:
+        elif features.has_recursion:
             return 'recursive'
-        elif has_loops:
-            nested_level = self._count_nested_loops(ast)
-            if nested_level >= 2:
+        elif features.has_loops:
+            if features.max_loop_depth >= 2:
                 return 'nested_loops'
             else:
                 # Distinguir búsqueda (puede terminar early) de procesamiento (debe completar)
-                has_early_return = self._has_early_return_in_loop(ast)
-                if has_early_return:
+                if features.early_return_in_loop:
                     return 'linear_search'  # Búsqueda lineal
                 else:
                     return 'linear_processing'  # Procesamiento lineal (suma, acumulación, etc.)
         else:
             return 'constant'
-    
-    def _has_recursion(self, node) -> bool:
-        """Verifica si hay llamadas recursivas."""
-        if isinstance(node, Function):
-            return self._check_recursive_calls(node, node.name)
-        elif hasattr(node, 'functions'):
-            for func in node.functions:
-                if self._check_recursive_calls(func, func.name):
-                    return True
+
+    def _extract_features(self, ast) -> AstFeatures:
+        """
+        Recorre el AST una sola vez y reúne todos los rasgos que usa la detección:
+        recursión, bucles, anidamiento, retornos tempranos, división binaria, decrementos de Fibonacci
+        e identificadores de pivote.
+        """
+        if isinstance(ast, Node):
+            cached = self._features_cache.get(ast)
+            if cached is not None:
+                return cached
+
+        features = AstFeatures(is_program=bool(_functions(ast)))
+
+        # Pila de (nodo, profundidad de bucles, función que lo contiene)
+        stack = [(ast, 0, None)]
+        while stack:
+            node, loop_depth, func = stack.pop()
+            node_type = type(node)
+            if node_type is Function:
+                func = FunctionFeatures(node.name)
+                features.functions.append(func)
+            elif node_type is For or node_type is While:
+                loop_depth += 1
+                features.has_loops = True
+                if loop_depth > features.max_loop_depth:
+                    features.max_loop_depth = loop_depth
+                if not features.early_return_in_loop:
+                    features.early_return_in_loop = self._body_has_early_return(node)
+            elif node_type is Call:
+                if func is not None:
+                    if node.name == func.name:
+                        func.recursive_calls += 1
+                    if not func.fib_decrements:
+                        func.fib_decrements = self._call_has_fibonacci_decrements(node)
+            elif node_type is Assignment:
+                # División binaria: x = (...) / 2 (el criterio lee el atributo 'value')
+                value = getattr(node, 'value', None)
+                if func is not None and isinstance(value, BinOp) and value.op == '/':
+                    func.has_binary_div = True
+            elif node_type is Var:
+                if not features.saw_pivot_identifier and _PIVOT_RE.search(node.name):
+                    features.saw_pivot_identifier = True
+
+            # Hijos en orden inverso para visitarlos en preorden (las funciones quedan en orden)
+            children = [(child, loop_depth, func) for child in _iter_children(node)]
+            children.reverse()
+            stack.extend(children)
+
+        if isinstance(ast, Node):
+            self._features_cache[ast] = features
+        return features
+
+    def _body_has_early_return(self, loop_node) -> bool:
+        """Un bucle tiene retorno temprano si su cuerpo contiene un Return directo o dentro de un if."""
+        for stmt in getattr(loop_node, 'body', None) or []:
+            if isinstance(stmt, Return):
+                return True
+            if isinstance(stmt, If) and self._has_return_in_if(stmt):
+                return True
         return False
-    
-    def _check_recursive_calls(self, node, func_name: str) -> bool:
-        """Busca llamadas recursivas en un nodo."""
-        if isinstance(node, Call) and node.name == func_name:
-            return True
-        
-        # Buscar en atributos
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__') and self._check_recursive_calls(item, func_name):
-                        return True
-            elif hasattr(attr, '__dict__'):
-                if self._check_recursive_calls(attr, func_name):
+
+    def _call_has_fibonacci_decrements(self, call: Call) -> bool:
+        """La llamada recibe argumentos de la forma x-1 y x-2 (se corta al ver ambos)."""
+        found = 0  # bit 0: decremento 1, bit 1: decremento 2
+        for arg in call.args:
+            if isinstance(arg, BinOp) and arg.op == '-' and isinstance(arg.right, Number):
+                value = arg.right.value
+                if value == 1:
+                    found |= 0b01
+                elif value == 2:
+                    found |= 0b10
+                if found == 0b11:
                     return True
-        
         return False
     
+    # Predicados individuales: lecturas del recorrido fusionado (memorizado por AST)
+
+    def _has_recursion(self, node) -> bool:
+        """Verifica si hay llamadas recursivas."""
+        return self._extract_features(node).has_recursion
+    
     def _has_loops(self, node) -> bool:
         """Verifica si hay bucles en el código."""
-        if isinstance(node, (For, While)):
-            return True
-        
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__') and self._has_loops(item):
-                        return True
-            elif hasattr(attr, '__dict__'):
-                if self._has_loops(attr):
-                    return True
-        
-        return False
+        return self._extract_features(node).has_loops
     
     def _has_early_return_in_loop(self, node) -> bool:
         """
@@ -243,140 +949,41 @@ class CaseAnalyzer:
         Un algoritmo de búsqueda puede terminar antes si encuentra el elemento.
         Un algoritmo de procesamiento debe completar todas las iteraciones.
         """
-        if isinstance(node, (For, While)):
-            # Estamos dentro de un bucle, buscar Return en el cuerpo
-            if hasattr(node, 'body'):
-                for stmt in node.body:
-                    if isinstance(stmt, Return):
-                        return True
-                    # Buscar Return dentro de if dentro del bucle
-                    if isinstance(stmt, If):
-                        if self._has_return_in_if(stmt):
-                            return True
-        
-        # Buscar recursivamente en otros nodos
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__') and self._has_early_return_in_loop(item):
-                        return True
-            elif hasattr(attr, '__dict__'):
-                if self._has_early_return_in_loop(attr):
-                    return True
-        
-        return False
+        return self._extract_features(node).early_return_in_loop
     
     def _has_return_in_if(self, if_node: If) -> bool:
         """Verifica si un nodo If contiene un Return."""
-        if if_node.then_block:
-            for stmt in if_node.then_block:
+        if if_node.then_body:
+            for stmt in if_node.then_body:
                 if isinstance(stmt, Return):
                     return True
-        if if_node.else_block:
-            for stmt in if_node.else_block:
+        if if_node.else_body:
+            for stmt in if_node.else_body:
                 if isinstance(stmt, Return):
                     return True
         return False
     
     def _count_nested_loops(self, node, depth: int = 0) -> int:
         """Cuenta el nivel de anidamiento de bucles."""
-        max_depth = depth
-        
-        if isinstance(node, (For, While)):
-            depth += 1
-            max_depth = depth
-            
-            # Analizar el cuerpo del bucle
-            if hasattr(node, 'body'):
-                for stmt in node.body:
-                    nested = self._count_nested_loops(stmt, depth)
-                    max_depth = max(max_depth, nested)
-        else:
-            # Buscar en atributos
-            for attr_name in dir(node):
-                if attr_name.startswith('_'):
-                    continue
-                attr = getattr(node, attr_name)
-                if isinstance(attr, (list, tuple)):
-                    for item in attr:
-                        if hasattr(item, '__dict__'):
-                            nested = self._count_nested_loops(item, depth)
-                            max_depth = max(max_depth, nested)
-                elif hasattr(attr, '__dict__'):
-                    nested = self._count_nested_loops(attr, depth)
-                    max_depth = max(max_depth, nested)
-        
-        return max_depth
+        return depth + self._extract_features(node).max_loop_depth
     
     def _has_divide_conquer_pattern(self, ast) -> bool:
-        """Detecta patrón de dividir y conquistar."""
-        # Buscar funciones con llamadas recursivas múltiples y división del problema
-        if hasattr(ast, 'functions'):
-            funcs = ast.functions
-        elif isinstance(ast, Function):
-            funcs = [ast]
-        else:
-            funcs = []
-
-        for func in funcs:
-            recursive_calls = self._count_recursive_calls(func, func.name)
-            if recursive_calls >= 2:  # Merge sort, quicksort, etc.
-                return True
-        return False
+        """Detecta patrón de dividir y conquistar (merge sort, quicksort, etc.)."""
+        return self._extract_features(ast).has_divide_conquer
     
     def _count_recursive_calls(self, node, func_name: str) -> int:
         """Cuenta el número de llamadas recursivas."""
         count = 0
         
-        if isinstance(node, Call) and node.name == func_name:
-            count += 1
-        
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__'):
-                        count += self._count_recursive_calls(item, func_name)
-            elif hasattr(attr, '__dict__'):
-                count += self._count_recursive_calls(attr, func_name)
+        for current in _walk(node):
+            if isinstance(current, Call) and current.name == func_name:
+                count += 1
         
         return count
     
     def _has_binary_search_pattern(self, ast) -> bool:
-        """Detecta patrón de búsqueda binaria."""
-        # Buscar división repetida del espacio de búsqueda
-        if hasattr(ast, 'functions'):
-            for func in ast.functions:
-                if self._check_binary_division(func):
-                    return True
-        return False
-    
-    def _check_binary_division(self, node) -> bool:
-        """Verifica si hay división binaria del problema."""
-        # Buscar patrones como mid = (left + right) / 2
-        if isinstance(node, Assignment):
-            if hasattr(node, 'value') and isinstance(node.value, BinOp):
-                if node.value.op == '/':
-                    return True
-        
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__') and self._check_binary_division(item):
-                        return True
-            elif hasattr(attr, '__dict__'):
-                if self._check_binary_division(attr):
-                    return True
-        
-        return False
+        """Detecta patrón de búsqueda binaria (división repetida del espacio de búsqueda)."""
+        return self._extract_features(ast).has_binary_search
     
     def _is_fibonacci_pattern(self, ast) -> bool:
         """
@@ -387,31 +994,13 @@ class CaseAnalyzer:
         - Argumentos con decrementos de 1 y 2
         - Nombre típico: fibonacci, fib
         """
-        if hasattr(ast, 'functions'):
-            for func in ast.functions:
-                # Verificar nombre
-                func_name = func.name.lower()
-                if 'fib' in func_name:
-                    # Contar llamadas recursivas
-                    recursive_calls = self._count_recursive_calls(func, func.name)
-                    if recursive_calls == 2:
-                        return True
-                
-                # Verificar patrón sin importar el nombre
-                elif self._count_recursive_calls(func, func.name) == 2:
-                    # Verificar que tenga patrón de decremento característico
-                    if self._has_fibonacci_decrement_pattern(func):
-                        return True
-        
-        return False
+        return self._extract_features(ast).is_fibonacci
     
-    def _is_prime_like_pattern(self, ast) -> bool:
+    def _is_prime_like_pattern(self, ast, ctx: Optional[_CallContext] = None) -> bool:
 
-        if hasattr(ast, 'functions') and ast.functions:
-            func = ast.functions[0]
-            name = func.name.lower()
-            if 'primo' in name or 'prime' in name:
-                return True
+        name = (ctx or _ast_context(ast)).func_name_lower
+        if 'primo' in name or 'prime' in name:
+            return True
 
         return self._has_modulo_guard_with_return(ast)
 
@@ -419,28 +1008,15 @@ class CaseAnalyzer:
         """
         Busca un patrón 'if (algo % algo == 0) then return ...' dentro de un bucle.
         """
-        # Si es un bucle, miramos su cuerpo
-        if isinstance(node, (For, While)):
-            body = getattr(node, 'body', []) or []
-            for stmt in body:
-                # if (...) { ... return ... }
-                if isinstance(stmt, If):
-                    if self._condition_has_modulo(stmt.condition) and self._has_return_in_if(stmt):
-                        return True
-
-        # Recorrer recursivamente el resto del AST
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__'):
-                        if self._has_modulo_guard_with_return(item):
+        for current in _walk(node):
+            # Si es un bucle, miramos su cuerpo
+            if isinstance(current, (For, While)):
+                body = getattr(current, 'body', []) or []
+                for stmt in body:
+                    # if (...) { ... return ... }
+                    if isinstance(stmt, If):
+                        if self._condition_has_modulo(stmt.condition) and self._has_return_in_if(stmt):
                             return True
-            elif hasattr(attr, '__dict__'):
-                if self._has_modulo_guard_with_return(attr):
-                    return True
 
         return False
 
@@ -457,424 +1033,40 @@ class CaseAnalyzer:
         """
         Devuelve True si la condición (o sub-expresiones) contiene una operación módulo '%'.
         """
-        if isinstance(cond, BinOp) and getattr(cond, 'op', None) == '%':
-            return True
-
-        # Buscar recursivamente en subexpresiones
-        for attr_name in dir(cond):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(cond, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__') and self._condition_has_modulo(item):
-                        return True
-            elif hasattr(attr, '__dict__'):
-                if self._condition_has_modulo(attr):
-                    return True
+        # Incluye las subexpresiones
+        for current in _walk(cond):
+            if isinstance(current, BinOp) and getattr(current, 'op', None) == '%':
+                return True
 
         return False
 
     
-    def _has_fibonacci_decrement_pattern(self, node) -> bool:
-        """
-        Verifica si las llamadas recursivas tienen el patrón n-1 y n-2.
-        """
-        # Buscar patrones BinOp con '-' y valores 1 y 2
-        decrements = []
-        
-        if isinstance(node, Call):
-            for arg in node.args:
-                if isinstance(arg, BinOp) and arg.op == '-':
-                    if isinstance(arg.right, Number):
-                        decrements.append(arg.right.value)
-        
-        for attr_name in dir(node):
-            if attr_name.startswith('_'):
-                continue
-            attr = getattr(node, attr_name)
-            if isinstance(attr, (list, tuple)):
-                for item in attr:
-                    if hasattr(item, '__dict__'):
-                        if self._has_fibonacci_decrement_pattern(item):
-                            return True
-            elif hasattr(attr, '__dict__'):
-                if self._has_fibonacci_decrement_pattern(attr):
-                    return True
-        
-        # Verificar si encontramos los decrementos 1 y 2
-        return 1 in decrements and 2 in decrements
+    def _analyze_best_case(self, ast, algorithm_type: str, complexity: str = None,
+                           ctx: Optional[_CallContext] = None) -> CaseAnalysis:
+        """Analiza el mejor caso del algoritmo (con ctx, la complejidad se toma del contexto)."""
+        return _best_case(algorithm_type, ctx or _ast_context(ast, complexity=complexity or ""))
+
     
-    def _analyze_best_case(self, ast, algorithm_type: str, complexity: str = None) -> CaseAnalysis:
-        func_name = "algoritmo"
-        if hasattr(ast, 'functions') and ast.functions:
-            func_name = ast.functions[0].name
-
-        comp = complexity or ""
-
-        best_cases = {
-            "fibonacci": CaseAnalysis(
-                case_type="best",
-                complexity=comp or "Θ(2ⁿ)",
-                scenario="Para n > 1 el árbol recursivo completo siempre se genera; no hay entradas “más fáciles”.",
-                ejemplo=f"{func_name}(n) con n > 1 ejecuta siempre el mismo patrón de llamadas.",
-                explanation=(
-                    "Fibonacci recursivo sin memoización es determinista: para cada n > 1 el número de llamadas está fijado. "
-                    "Asintóticamente, mejor, peor y promedio coinciden en Θ(2ⁿ). Para n = 0 o n = 1 el coste se reduce a Θ(1)."
-                ),
-            ),
-            'binary_search': CaseAnalysis(
-                case_type='best',
-                complexity='Θ(1)',
-                scenario='El elemento buscado está justo en la posición central en la primera comparación.',
-                ejemplo=f'{func_name}([1,2,3,4,5], 3) → se encuentra en el primer intento.',
-                explanation='En el mejor caso sólo se realiza una comparación antes de retornar el resultado.'
-            ),
-            'prime_test': CaseAnalysis(
-                case_type='best',
-                complexity='Θ(1)',
-                scenario='Se detecta un caso trivial (n ≤ 1) o un divisor muy pequeño en la primera iteración.',
-                ejemplo=f'{func_name}(1), {func_name}(0) o {func_name}(4) → se devuelve enseguida.',
-                explanation=('El mejor caso ocurre cuando se sale por el caso base n ≤ 1 o cuando el primer divisor probado '
-                             'divide a n (por ejemplo i = 2 en un bucle que prueba divisores).')
-            ),
-            "recursive": CaseAnalysis(
-                case_type="best",
-                complexity=comp or "Θ(n)",
-                scenario="Recursión determinista sin ramas de salida temprana dependientes de los datos.",
-                ejemplo=f"{func_name}(n) recorre siempre la misma profundidad de recursión para ese n (como factorial).",
-                explanation=(
-                    "Cuando la recursión sólo depende del parámetro de tamaño (ej. factorial), "
-                    "todas las entradas de tamaño n inducen el mismo trabajo. "
-                    "Asintóticamente, la mejor cota coincide con la peor y la promedio."
-                ),
-            ),
-            "binary_search": CaseAnalysis(
-                case_type="best",
-                complexity="Θ(1)",
-                scenario="El elemento buscado está exactamente en la posición central en la primera comparación.",
-                ejemplo=f"{func_name}([1,2,3,4,5], 3) → se encuentra en la primera comparación.",
-                explanation="En el mejor caso la búsqueda binaria termina tras una sola comparación.",
-            ),
-            "linear_search": CaseAnalysis(
-                case_type="best",
-                complexity="Θ(1)",
-                scenario="El elemento buscado aparece en la primera posición o la estructura está vacía.",
-                ejemplo="buscar_lineal([5,2,3], 5) → encontrado en el índice 0.",
-                explanation="La búsqueda lineal puede terminar tras revisar únicamente el primer elemento.",
-            ),
-            "linear_processing": CaseAnalysis(
-                case_type="best",
-                complexity=comp or "Θ(n)",
-                scenario="El algoritmo debe procesar todos los elementos sin posibilidad de cortar antes.",
-                ejemplo=f"{func_name}(n) → recorre todos los elementos (por ejemplo, suma de un arreglo).",
-                explanation=(
-                    "En algoritmos de procesamiento puro (suma, acumulación, transformación), "
-                    "no hay condición de salida temprana: siempre se recorre toda la entrada."
-                ),
-            ),
-            "constant": CaseAnalysis(
-                case_type="best",
-                complexity="Θ(1)",
-                scenario="Operación directa sin iteraciones ni recursión.",
-                ejemplo="asignación simple, acceso a una posición de un arreglo.",
-                explanation="El tiempo de ejecución no depende del tamaño de la entrada.",
-            ),
-        }
-
-        # Algoritmos divide & conquer tipo MergeSort / QuickSort (mejor caso)
-        if algorithm_type == "divide_conquer":
-            return CaseAnalysis(
-                case_type="best",
-                complexity="Θ(n log n)",
-                scenario="La estrategia divide-y-vencerás se aplica con particiones razonablemente balanceadas.",
-                ejemplo=f"{func_name}(n) realiza ~log₂(n) niveles de división con trabajo lineal por nivel.",
-                explanation=(
-                    "En algoritmos como MergeSort y QuickSort (con pivote razonable), el número de niveles es O(log n) "
-                    "y cada nivel hace trabajo O(n), dando lugar a Θ(n log n) incluso en el mejor caso asintótico."
-                ),
-            )
-
-        # Bucles anidados sin early break: mejor caso = mismo orden que el peor
-        if algorithm_type == "nested_loops":
-            return CaseAnalysis(
-                case_type="best",
-                complexity=comp or "Θ(n²)",
-                scenario="Bucles anidados sin corte anticipado; los rangos se recorren completos.",
-                ejemplo="Triple bucle, multiplicación de matrices, bubble_sort sin optimizaciones.",
-                explanation=(
-                    "Si no hay break / return de salida temprana, el número de iteraciones de los bucles anidados "
-                    "depende sólo de n. El mejor caso es del mismo orden que el peor."
-                ),
-            )
-
-        # Si tenemos un caso específico en el diccionario, lo usamos
-        if algorithm_type in best_cases:
-            return best_cases[algorithm_type]
-
-        # Fallback genérico
-        return CaseAnalysis(
-            case_type="best",
-            complexity=comp or "Θ(1)",
-            scenario="Caso base o condición trivial.",
-            ejemplo="N/A",
-            explanation="Mejor escenario posible de ejecución.",
-        )
+    def _analyze_worst_case(self, ast, algorithm_type: str, complexity: str = None,
+                            ctx: Optional[_CallContext] = None) -> CaseAnalysis:
+        """Analiza el peor caso del algoritmo (con ctx, la complejidad se toma del contexto)."""
+        if ctx is None:
+            # Los rasgos del AST sólo hacen falta para distinguir QuickSort de MergeSort
+            features = self._extract_features(ast) if algorithm_type == "divide_conquer" else None
+            ctx = _ast_context(ast, features=features, complexity=complexity or "")
+        return _worst_case(algorithm_type, ctx)
 
     
-    def _analyze_worst_case(self, ast, algorithm_type: str, complexity: str = None) -> CaseAnalysis:
-        """Analiza el peor caso del algoritmo."""
-        func_name = "algoritmo"
-        if hasattr(ast, 'functions') and ast.functions:
-            func_name = ast.functions[0].name
-
-        comp = complexity or ""
-
-        # nested_loops: el peor caso es exactamente la cota que dio el motor matemático
-        if algorithm_type == "nested_loops":
-            return CaseAnalysis(
-                case_type="worst",
-                complexity=comp or "Θ(n²)",
-                scenario="Todos los bucles anidados recorren su rango completo.",
-                ejemplo="bubble_sort con arreglo invertido; triple bucle sobre n.",
-                explanation=(
-                    "El motor matemático determinó la expresión de coste y su orden dominante; "
-                    "el peor caso coincide con esa cota (por ejemplo Θ(n²), Θ(n³), etc.)."
-                ),
-            )
-
-        # divide_conquer: diferenciamos entre MergeSort y QuickSort aproximando via AST
-        if algorithm_type == "divide_conquer":
-            # Heurística simple: si el nombre de la función o variables contienen 'quick' o 'pivot',
-            # asumimos QuickSort (peor caso n²); en otro caso, MergeSort-like (n log n).
-            func_lower = func_name.lower()
-            is_quick = "quick" in func_lower or "qsort" in func_lower
-
-            # Buscar identificadores tipo 'pivot' / 'pivote' en el AST
-            if hasattr(ast, "functions") and ast.functions:
-                for f in ast.functions:
-                    for attr_name in dir(f):
-                        if attr_name.startswith("_"):
-                            continue
-                        attr = getattr(f, attr_name)
-                        if isinstance(attr, Var):
-                            name = getattr(attr, "name", "").lower()
-                            if "pivot" in name or "pivote" in name:
-                                is_quick = True
-
-            if is_quick:
-                return CaseAnalysis(
-                    case_type="worst",
-                    complexity="Θ(n²)",
-                    scenario="Particiones extremadamente desbalanceadas (pivote siempre el mínimo o máximo).",
-                    ejemplo=f"{func_name} sobre un arreglo ya ordenado usando siempre el primer elemento como pivote.",
-                    explanation=(
-                        "En QuickSort, si el pivote parte el arreglo en 1 y n-1 elementos en cada llamada, "
-                        "se obtiene la recurrencia T(n) = T(n-1) + O(n), cuya solución es Θ(n²)."
-                    ),
-                )
-            else:
-                return CaseAnalysis(
-                    case_type="worst",
-                    complexity=comp or "Θ(n log n)",
-                    scenario="División razonablemente balanceada en cada nivel de recursión.",
-                    ejemplo=f"{func_name}(n) tipo MergeSort con particiones en mitades.",
-                    explanation=(
-                        "Cuando la estrategia de división no depende adversamente de la distribución de datos, "
-                        "la recurrencia T(n) = 2T(n/2) + O(n) se resuelve como Θ(n log n)."
-                    ),
-                )
+    def _has_pivot_identifier(self, ast) -> bool:
+        """Hay identificadores tipo 'pivot' / 'pivote' en cualquier punto del AST."""
+        return self._extract_features(ast).saw_pivot_identifier
 
-        if algorithm_type == "recursive":
-            return CaseAnalysis(
-                case_type="worst",
-                complexity=comp or "Θ(n)",
-                scenario="Profundidad de recursión máxima para entradas de tamaño n.",
-                ejemplo=f"{func_name}(n) recursivo sin poda ni memoización.",
-                explanation=(
-                    "La cota asintótica del peor caso coincide con la que devuelve el motor matemático "
-                    "(por ejemplo Θ(n) para factorial, Θ(2ⁿ) para recursiones exponenciales)."
-                ),
-            )
-
-        worst_cases = {
-            "fibonacci": CaseAnalysis(
-                case_type="worst",
-                complexity="Θ(2ⁿ) ≈ Θ(2ⁿ)",
-                scenario="Cualquier valor n > 1 (el algoritmo es determinista).",
-                ejemplo=f"{func_name}(10) genera ~2¹⁰ ≈ 1024 llamadas recursivas en un árbol binario.",
-                explanation=(
-                    "Fibonacci recursivo sin memoización SIEMPRE es exponencial. La base exacta es 2≈1.618, "
-                    "pero O(2ⁿ) es la cota superior estándar. No hay 'mejor o peor entrada', sólo depende de n."
-                ),
-            ),
-            'binary_search': CaseAnalysis(
-                case_type='worst',
-                complexity='Θ(log n)',
-                scenario='El elemento no está en el arreglo o se encuentra tras descartar casi todos los subarreglos.',
-                ejemplo=f'{func_name}([1,2,3,4,5,6,7,8], 9) → se exploran ~log₂(n) divisiones.',
-                explanation=('Cada comparación reduce el espacio de búsqueda a la mitad. '
-                             'En el peor caso se requieren O(log n) pasos antes de determinar la posición o ausencia.')
-            ),
-            'prime_test': CaseAnalysis(
-                case_type='worst',
-                complexity='Θ(n)',
-                scenario='n es primo o no tiene divisores pequeños; el bucle recorre todos los candidatos.',
-                ejemplo=f'{func_name}(p) donde p es primo grande → se prueban todos los i desde 2 hasta n-1.',
-                explanation=('En el peor caso se comprueban todos los posibles divisores hasta n-1, '
-                             'lo que implica un número lineal de iteraciones en n.')
-            ),
-            "binary_search": CaseAnalysis(
-                case_type="worst",
-                complexity="Θ(log n)",
-                scenario="El elemento no está en el arreglo o está en una posición que requiere todas las divisiones.",
-                ejemplo=f"{func_name}([1,2,3,4,5,6,7,8], 9) → log₂(8) divisiones hasta espacio vacío.",
-                explanation=(
-                    "La búsqueda binaria divide el espacio de búsqueda a la mitad en cada paso. "
-                    "En el peor caso necesita Θ(log n) comparaciones."
-                ),
-            ),
-            "linear_search": CaseAnalysis(
-                case_type="worst",
-                complexity="Θ(n)",
-                scenario="Elemento al final del arreglo o no encontrado.",
-                ejemplo="buscar_lineal([1,2,3,4,5], 5) → n comparaciones.",
-                explanation="Se recorre toda la estructura hasta el final.",
-            ),
-            "linear_processing": CaseAnalysis(
-                case_type="worst",
-                complexity=comp or "Θ(n)",
-                scenario="El algoritmo debe procesar todos los elementos (sin salida temprana).",
-                ejemplo=f"{func_name}(n) → procesa exactamente n elementos.",
-                explanation=(
-                    "Algoritmos de procesamiento deben completar todas las iteraciones. "
-                    "El 'peor caso' coincide con el 'mejor caso' porque no hay optimización posible."
-                ),
-            ),
-            "constant": CaseAnalysis(
-                case_type="worst",
-                complexity="Θ(1)",
-                scenario="Operación directa sin iteraciones ni recursión.",
-                ejemplo="suma = a + b.",
-                explanation="Tiempo constante independiente del tamaño de entrada.",
-            ),
-        }
-
-        return worst_cases.get(
-            algorithm_type,
-            CaseAnalysis(
-                case_type="worst",
-                complexity=comp or "Θ(n)",
-                scenario="Peor escenario de ejecución.",
-                ejemplo="N/A",
-                explanation="Máximo número de operaciones requeridas.",
-            ),
-        )
+    def _analyze_average_case(self, ast, algorithm_type: str, complexity: str = None,
+                              ctx: Optional[_CallContext] = None) -> CaseAnalysis:
+        """Analiza el caso promedio del algoritmo (con ctx, la complejidad se toma del contexto)."""
+        return _average_case(algorithm_type, ctx or _ast_context(ast, complexity=complexity or ""))
 
-    
-    def _analyze_average_case(self, ast, algorithm_type: str, complexity: str = None) -> CaseAnalysis:
-        """Analiza el caso promedio del algoritmo."""
-        func_name = "algoritmo"
-        if hasattr(ast, 'functions') and ast.functions:
-            func_name = ast.functions[0].name
-
-        comp = complexity or ""
-
-        average_cases = {
-            "fibonacci": CaseAnalysis(
-                case_type="average",
-                complexity="Θ(2ⁿ) ≈ Θ(2ⁿ)",
-                scenario="Cualquier valor n > 1 (no depende de los datos, solo de n).",
-                ejemplo=f"{func_name}(n) siempre genera ~2ⁿ llamadas, donde 2 = 1.618...",
-                explanation=(
-                    "Fibonacci recursivo es determinista: para un n dado, siempre ejecuta la misma cantidad de operaciones. "
-                    "No tiene 'caso promedio' en el sentido tradicional porque no depende de la disposición de datos."
-                ),
-            ),
-            'binary_search': CaseAnalysis(
-                case_type='average',
-                complexity='Θ(log n)',
-                scenario='El elemento buscado está en una posición aleatoria del arreglo ordenado o puede no estar.',
-                ejemplo='En promedio se realizan ~log₂(n) comparaciones.',
-                explanation=('Cada comparación descarta la mitad del espacio; para claves aleatorias o presencia/ausencia '
-                             'aleatoria, el número esperado de pasos es proporcional a log n.')
-            ),
-            'prime_test': CaseAnalysis(
-                case_type='average',
-                complexity='Θ(n)',
-                scenario='n es un entero cualquiera, sin sesgo especial hacia primos o compuestos fáciles.',
-                ejemplo=f'En promedio se comprueba una fracción de los posibles divisores antes de encontrar uno o concluir primalidad.',
-                explanation=('Aunque muchas entradas compuestas se descartan antes de probar todos los divisores, '
-                             'asintóticamente la cantidad esperada de iteraciones sigue siendo lineal en n.')
-            ),
-            "divide_conquer": CaseAnalysis(
-                case_type="average",
-                complexity="Θ(n log n)",
-                scenario="Datos de entrada distribuidos aleatoriamente.",
-                ejemplo=f"{func_name} con pivotes aleatorios o divisiones razonablemente balanceadas.",
-                explanation=(
-                    "En promedio, los algoritmos divide & conquer mantienen Θ(n log n). "
-                    "QuickSort con pivotes aleatorios evita el peor caso Θ(n²); MergeSort siempre es Θ(n log n)."
-                ),
-            ),
-            "recursive": CaseAnalysis(
-                case_type="average",
-                complexity=comp or "Θ(n)",
-                scenario="Depende del tipo de recursión: lineal (una llamada) o exponencial (múltiples).",
-                ejemplo=f"Recursión lineal: {func_name}(n) hace n llamadas; recursión exponencial: árbol de llamadas completo.",
-                explanation=(
-                    "La complejidad promedio depende de la estructura: lineal T(n)=T(n-1)+c es Θ(n), "
-                    "exponencial sin memoización es Θ(2ⁿ)."
-                ),
-            ),
-            "nested_loops": CaseAnalysis(
-                case_type="average",
-                complexity=comp or "Θ(n²)",
-                scenario="Datos de entrada aleatorios sin cambios en los límites de los bucles.",
-                ejemplo="Ordenamientos y algoritmos con bucles anidados que siempre recorren sus rangos completos.",
-                explanation=(
-                    "Si los límites de los bucles no dependen de la distribución de datos, "
-                    "el caso promedio tiene el mismo orden que el peor y el mejor caso."
-                ),
-            ),
-            "linear_search": CaseAnalysis(
-                case_type="average",
-                complexity="Θ(n/2) = Θ(n)",
-                scenario="Elemento en posición aleatoria.",
-                ejemplo="buscar_lineal → elemento en mitad del arreglo en promedio.",
-                explanation="En promedio, se recorre la mitad de la estructura.",
-            ),
-            "linear_processing": CaseAnalysis(
-                case_type="average",
-                complexity=comp or "Θ(n)",
-                scenario="El algoritmo procesa todos los elementos independientemente de sus valores.",
-                ejemplo=f"{func_name}(n) → siempre procesa n elementos.",
-                explanation=(
-                    "No existe variación relevante en el caso promedio: el algoritmo procesa todos los elementos "
-                    "independientemente de su contenido."
-                ),
-            ),
-            "constant": CaseAnalysis(
-                case_type="average",
-                complexity="Θ(1)",
-                scenario="Operación directa.",
-                ejemplo="Asignación o acceso directo.",
-                explanation="Tiempo constante siempre.",
-            ),
-        }
-
-        return average_cases.get(
-            algorithm_type,
-            CaseAnalysis(
-                case_type="average",
-                complexity=comp or "Θ(n)",
-                scenario="Caso promedio de ejecución.",
-                ejemplo="N/A",
-                explanation="Complejidad esperada para datos aleatorios.",
-            ),
-        )
-
-    def get_case_comparison_summary(self, cases: Dict[str, CaseAnalysis]) -> str:
+    def get_case_comparison_summary(self, cases: Mapping[str, CaseAnalysis]) -> str:
         """
         Genera un resumen comparativo de todos los casos.
         
@@ -884,20 +1076,11 @@ class CaseAnalyzer:
         Returns:
             String con resumen formateado
         """
-        
-        summary = "═" * 70 + "\n"
-        summary += "ANÁLISIS COMPARATIVO DE CASOS\n"
-        summary += "═" * 70 + "\n\n"
-        
-        for case_name, analysis in cases.items():
-            summary += f"{'━' * 70}\n"
-            summary += f"{case_name.upper()} CASO ({analysis.case_type.upper()})\n"
-            summary += f"{'━' * 70}\n"
-            summary += f"📊 Complejidad:  {analysis.complexity}\n"
-            summary += f"📋 Escenario:    {analysis.scenario}\n"
-            summary += f"💡 Ejemplo:      {analysis.ejemplo}\n"
-            summary += f"📖 Explicación:  {analysis.explanation}\n\n"
-        
-        summary += "═" * 70 + "\n"
-        
-        return summary
+        return "".join(_iter_summary_parts(cases))
+
+    def write_case_comparison_summary(self, cases: Mapping[str, CaseAnalysis], file: TextIO) -> None:
+        """
+        Escribe el mismo resumen que get_case_comparison_summary directamente en un archivo/stream,
+        sin construir el texto completo en memoria.
+        """
+        file.writelines(_iter_summary_parts(cases))
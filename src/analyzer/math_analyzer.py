@@ -511,6 +511,8 @@ class MathematicalAnalyzer:
             return left * right
         elif node.op == '/':
             return left / right
+        elif node.op == '%':
+            return sympy.Mod(left, right)
         else:
             # Operador desconocido, por defecto suma
             return left + right
@@ -1,7 +1,9 @@
 # src/ast/nodes.py
 
 class Node:
-    pass
+    # Profundidad maxima de bucles anidados bajo el nodo, calculada por el parser.
+    # None indica que no se conoce (p. ej. nodos construidos a mano).
+    loop_depth = None
 
 class Program(Node):
     def __init__(self, functions):
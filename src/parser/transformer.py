@@ -1,11 +1,22 @@
 from lark import Transformer, v_args
 from src.ast.nodes import *
 
+
+def _with_loop_depth(node, *bodies, is_loop=False):
+    """Anota en el nodo la profundidad maxima de bucles de sus cuerpos (+1 si el nodo es un bucle)."""
+    depth = 0
+    for body in bodies:
+        for stmt in body or []:
+            depth = max(depth, getattr(stmt, 'loop_depth', None) or 0)
+    node.loop_depth = depth + 1 if is_loop else depth
+    return node
+
 @v_args(inline=True)
 class ASTTransformer(Transformer):
 
     def start(self, *functions):
-        return Program(list(functions))
+        functions = list(functions)
+        return _with_loop_depth(Program(functions), functions)
 
     def function(self, function_token, name, *args):
         # Handle optional params: either (name, params, body) or (name, body)
@@ -14,10 +25,10 @@ class ASTTransformer(Transformer):
         
         if len(args) == 2:
             params, body = args
-            return Function(func_name, params or [], body)
+            return _with_loop_depth(Function(func_name, params or [], body), body)
         elif len(args) == 1:
             body = args[0]
-            return Function(func_name, [], body)
+            return _with_loop_depth(Function(func_name, [], body), body)
         else:
             raise ValueError(f"Unexpected arguments for function: {args}")
 
@@ -36,7 +47,7 @@ class ASTTransformer(Transformer):
         return Assignment(str(name), expr)
 
     def for_statement(self, _for, name, _assign, start, _to, end, _do, body):
-        return For(str(name), start, end, body)
+        return _with_loop_depth(For(str(name), start, end, body), body, is_loop=True)
 
     def while_statement(self, *args):
         """
@@ -50,31 +61,31 @@ class ASTTransformer(Transformer):
         """
         cond = args[-2]
         body = args[-1]
-        return While(cond, body)
+        return _with_loop_depth(While(cond, body), body, is_loop=True)
 
     def if_statement(self, *args):
         # Handle different if statement formats
         if len(args) == 6:
             # IF cond THEN body ELSE body
             if_token, cond, then_token, then_body, else_token, else_body = args
-            return If(cond, then_body, else_body)
+            return _with_loop_depth(If(cond, then_body, else_body), then_body, else_body)
         elif len(args) == 5:
             # IF cond body ELSE body
             if_token, cond, then_body, else_token, else_body = args
-            return If(cond, then_body, else_body)
+            return _with_loop_depth(If(cond, then_body, else_body), then_body, else_body)
         elif len(args) == 4:
             # IF cond THEN body
             if_token, cond, then_token, then_body = args
-            return If(cond, then_body, None)
+            return _with_loop_depth(If(cond, then_body, None), then_body)
         elif len(args) == 3:
             # IF cond body
             if_token, cond, then_body = args
-            return If(cond, then_body, None)
+            return _with_loop_depth(If(cond, then_body, None), then_body)
         else:
             raise ValueError(f"Unexpected if_statement arguments: {args}")
 
     def repeat_statement(self, body, cond):
-        return Repeat(body, cond)
+        return _with_loop_depth(Repeat(body, cond), body, is_loop=True)
 
     def return_statement(self, return_token, expr):
         return Return(expr)
@@ -108,6 +119,9 @@ class ASTTransformer(Transformer):
     def div(self, left, right):
         return BinOp(left, '/', right)
 
+    def mod(self, left, right):
+        return BinOp(left, '%', right)
+
     def NAME(self, token):
         return Var(str(token))
 
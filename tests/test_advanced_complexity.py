@@ -398,6 +398,26 @@ class TestMultipleFunctions:
         print(f"✅ Multiple functions: {result}")
 
 
+class TestRecursionDetection:
+    """Test detection of self-calls nested inside expressions."""
+
+    def test_recursive_call_inside_modulo(self):
+        """A self-call inside a % expression is still detected as linear recursion."""
+        code = """
+        function f(n)
+        begin
+            return call f(n - 1) % 7
+        end
+        """
+        ast = parse_code(code)
+        analyzer = AdvancedComplexityAnalyzer()
+        analyzer.analyze(ast)
+
+        assert analyzer.recursive_calls['f']['count'] == 1
+        assert analyzer.recursive_calls['f']['pattern'] == 'linear'
+        print(f"✅ Recursion inside modulo: {analyzer.recursive_calls['f']['pattern']}")
+
+
 def run_all_tests():
     """Run all complexity analysis tests."""
     print("🧪 Running Advanced Complexity Analyzer Tests\n")
@@ -0,0 +1,172 @@
+from src.parser.parser import parse_code
+from src.analyzer.asymptotic_analyzer import AsymptoticAnalyzer, Method, Pattern
+from src.analyzer.recurrence_solver import RecursiveAlgorithmAnalyzer
+from src.ast.nodes import Assignment, For, Function, Number
+
+
+NESTED_LOOPS = """
+function doble(n)
+begin
+    s = 0
+    for i = 1 to n do
+    begin
+        for j = 1 to n do
+        begin
+            s = s + 1
+        end
+    end
+    return s
+end
+"""
+
+FIBONACCI = """
+function fibonacci(n)
+begin
+    if n <= 1
+    begin
+        return n
+    end
+    else
+    begin
+        return call fibonacci(n - 1) + call fibonacci(n - 2)
+    end
+end
+"""
+
+
+def test_analyze_reuses_cached_result():
+    """Analizar dos veces el mismo nodo devuelve el resultado memorizado."""
+    ast = parse_code(NESTED_LOOPS)
+    analyzer = AsymptoticAnalyzer()
+
+    first = analyzer.analyze(ast)
+    second = analyzer.analyze(ast)
+
+    assert first[0] is second[0] and first[1] is second[1]
+    assert first[1].complexity == "n^2"
+    assert len(analyzer.analysis_cache) == 1
+
+    analyzer.clear_cache()
+    assert not analyzer.analysis_cache
+
+
+def test_analyze_cache_distinguishes_recursive_info():
+    """La misma funcion con y sin informacion recursiva produce entradas distintas."""
+    func = parse_code(FIBONACCI).functions[0]
+    info = RecursiveAlgorithmAnalyzer().analyze_recursive_algorithm(func)
+    analyzer = AsymptoticAnalyzer()
+
+    _, iterative = analyzer.analyze(func)
+    _, recursive = analyzer.analyze(func, info)
+
+    assert iterative.complexity == "1"
+    assert recursive.complexity == "2^n"
+    assert len(analyzer.analysis_cache) == 2
+
+
+def test_analyze_cache_is_bounded():
+    """La cache expulsa las entradas mas antiguas al superar su capacidad."""
+    analyzer = AsymptoticAnalyzer(cache_size=2)
+    for depth in range(1, 4):
+        body = [Assignment("s", Number(1))]
+        for _ in range(depth):
+            body = [For("i", Number(1), Number(10), body)]
+        analyzer.analyze(Function("f", ["n"], body))
+
+    assert len(analyzer.analysis_cache) == 2
+
+
+def test_analyze_cache_is_structural():
+    """Dos parseos del mismo codigo comparten la entrada de la cache."""
+    analyzer = AsymptoticAnalyzer()
+    first = analyzer.analyze(parse_code(NESTED_LOOPS).functions[0])
+    second = analyzer.analyze(parse_code(NESTED_LOOPS).functions[0])
+
+    assert first[0] is second[0] and first[1] is second[1]
+    assert len(analyzer.analysis_cache) == 1
+
+    renamed = analyzer.analyze(parse_code(NESTED_LOOPS.replace("doble", "otra")).functions[0])
+    assert renamed[1] is first[1]
+
+
+def test_recursive_analysis_does_not_scan_ast():
+    """Con recursion la clave sale de recursive_info y el AST no se recorre."""
+    func = parse_code(FIBONACCI).functions[0]
+    info = RecursiveAlgorithmAnalyzer().analyze_recursive_algorithm(func)
+    analyzer = AsymptoticAnalyzer()
+
+    analyzer.analyze(func, info)
+
+    assert len(analyzer._scan_cache) == 0
+
+
+def test_loop_depth_handles_deep_nesting():
+    """El recorrido iterativo no depende del limite de recursion de Python."""
+    body = [Assignment("s", Number(1))]
+    for _ in range(5000):
+        body = [For("i", Number(1), Number(10), body)]
+    func = Function("profundo", ["n"], body)
+
+    assert AsymptoticAnalyzer()._count_loop_depth(func) == 5000
+
+
+def test_parser_annotates_loop_depth():
+    """El parser anota la profundidad de bucles y el analizador la reutiliza."""
+    ast = parse_code(NESTED_LOOPS)
+    func = ast.functions[0]
+
+    assert ast.loop_depth == 2 and func.loop_depth == 2
+    assert func.body[1].loop_depth == 2  # el for externo
+    assert AsymptoticAnalyzer()._count_loop_depth(func) == 2
+
+
+def test_recurrence_builders_per_pattern():
+    """Cada patron de recursion sin relacion derivada usa su constructor propio."""
+    analyzer = AsymptoticAnalyzer()
+    calls = [{}, {}]
+    expected = {
+        'linear': "T(n) = T(n-1) + c",
+        'binary_exclusive': "T(n) = T(n/2) + c",
+        'binary': "T(n) = T(n-1) + T(n-2) + c",
+        'divide_conquer': "T(n) = 2T(n/2) + n",
+        'multiple': "T(n) = 2T(n-1) + c",
+    }
+    for pattern, equation in expected.items():
+        info = {'has_recursion': True, 'pattern_type': pattern, 'recursive_calls': calls}
+        assert analyzer._construct_recurrence(None, info).equation == equation
+
+
+def test_recurrence_tags_method_and_pattern():
+    """La recurrencia lleva etiquetas enteras de metodo y patron para despachar sin comparar texto."""
+    func = parse_code(FIBONACCI).functions[0]
+    info = RecursiveAlgorithmAnalyzer().analyze_recursive_algorithm(func)
+    rec, bound = AsymptoticAnalyzer().analyze(func, info)
+
+    assert rec.method == Method.TREE and rec.pattern == Pattern.FIB
+    assert rec.method_used == "Recurrence Tree"
+    assert bound.complexity == "2^n"
+
+
+def test_linear_recursion_short_circuit_matches_solver():
+    """El atajo de recursion lineal devuelve lo mismo que construir y resolver la recurrencia."""
+    info = {'has_recursion': True, 'pattern_type': 'linear', 'recursive_calls': [{}]}
+    analyzer = AsymptoticAnalyzer()
+
+    rec, bound = analyzer.analyze_function_node(None, info)
+
+    assert rec.equation == "T(n) = T(n-1) + c"
+    assert bound == analyzer._solve_recurrence(analyzer._construct_recurrence(None, info))
+
+
+def test_derived_divide_conquer_requires_valid_master_parameters():
+    """Solo se aplica el Teorema Maestro con a >= 1 y b >= 2; si no, se usa la cota por defecto."""
+    analyzer = AsymptoticAnalyzer()
+
+    def bound(relation):
+        info = {'has_recursion': True, 'recurrence_relation': relation}
+        return analyzer.analyze(None, info)[1]
+
+    general = bound("T(n) = 3T(n/4) + n")
+    assert general.complexity == "n" and general.notation == "Θ"
+    assert bound("T(n) = T(n/1) + 1").complexity == "n"
+    assert bound("T(n) = 0T(n/2) + n").complexity == "n"
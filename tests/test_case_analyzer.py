@@ -0,0 +1,195 @@
+from src.parser.parser import parse_code
+from src.analyzer.case_analyzer import _CHILDREN, CaseAnalyzer
+from src.ast.nodes import Assignment, Call, For, Function, Node, Number, Program, Var
+
+
+BUSQUEDA = """
+function buscar(a, n, x)
+begin
+    for i = 1 to n do
+    begin
+        if a[i] == x
+        begin
+            return i
+        end
+    end
+    return -1
+end
+"""
+
+
+def test_detects_early_return_inside_if():
+    """Un return dentro de un if en el bucle se reconoce como busqueda lineal."""
+    ast = parse_code(BUSQUEDA)
+    features = CaseAnalyzer()._extract_features(ast)
+
+    assert features.has_loops and features.max_loop_depth == 1
+    assert features.early_return_in_loop
+    assert CaseAnalyzer()._detect_algorithm_type(ast) == 'linear_search'
+
+
+def test_analyze_all_cases_is_memoized():
+    """Repetir el analisis con el mismo AST y argumentos devuelve el resultado memorizado."""
+    ast = parse_code(BUSQUEDA)
+    analyzer = CaseAnalyzer()
+
+    first = analyzer.analyze_all_cases(ast, complexity="n")
+    second = analyzer.analyze_all_cases(ast, complexity="n")
+
+    assert first is second
+    assert first['worst'].complexity == "Θ(n)"
+    assert analyzer._extract_features(ast) is analyzer._extract_features(ast)
+
+    analyzer.clear_cache()
+    assert analyzer.analyze_all_cases(ast, complexity="n") is not first
+
+
+def test_visitors_handle_deep_nesting():
+    """Los recorridos usan pila explicita y no dependen del limite de recursion."""
+    body = [Assignment("s", Number(1))]
+    for _ in range(5000):
+        body = [For("i", Number(1), Number(10), body)]
+    ast = Program([Function("profundo", ["n"], body)])
+    analyzer = CaseAnalyzer()
+
+    assert analyzer._count_nested_loops(ast) == 5000
+    assert analyzer._extract_features(ast).max_loop_depth == 5000
+    assert analyzer._detect_algorithm_type(ast) == 'nested_loops'
+
+
+def test_without_math_info_uses_math_based_cases():
+    """Sin recurrencia ni complejidad se devuelven los casos genericos del motor matematico."""
+    cases = CaseAnalyzer().analyze_all_cases(parse_code(BUSQUEDA))
+
+    assert set(cases) == {'best', 'worst', 'average'}
+    assert all(case.complexity == "No determinado" for case in cases.values())
+    assert cases['worst'].case_type == 'worst'
+
+
+def test_analyze_all_cases_cache_is_bounded():
+    """La cache de casos expulsa las entradas mas antiguas al superar su capacidad."""
+    analyzer = CaseAnalyzer(cache_size=2)
+    asts = [parse_code(BUSQUEDA) for _ in range(3)]
+    for ast in asts:
+        analyzer.analyze_all_cases(ast, complexity="n")
+
+    assert len(analyzer.analysis_cache) == 2
+    assert (id(asts[0]), 'unknown', None, "n") not in analyzer.analysis_cache
+
+
+def test_cases_are_built_lazily_and_cache_releases_ast():
+    """Cada caso se construye al leerlo y la cache no retiene el AST analizado."""
+    import gc
+
+    ast = parse_code(BUSQUEDA)
+    analyzer = CaseAnalyzer()
+    cases = analyzer.analyze_all_cases(ast, complexity="n")
+
+    assert not cases._cache
+    assert cases.worst is cases['worst'] and list(cases._cache) == ['worst']
+    assert dict(cases).keys() == {'best', 'worst', 'average'}
+
+    del ast
+    gc.collect()
+    assert all(ref() is None for ref, _ in analyzer.analysis_cache.values())
+
+
+def test_cached_cases_do_not_reference_analyzer():
+    """Los casos memorizados no apuntan al analizador: soltarlo lo libera sin el recolector de ciclos."""
+    import gc
+    import weakref
+
+    ast = parse_code(BUSQUEDA)
+    analyzer = CaseAnalyzer()
+    cases = analyzer.analyze_all_cases(ast, complexity="n")
+    ref = weakref.ref(analyzer)
+
+    gc.disable()
+    try:
+        del analyzer
+        assert ref() is None
+    finally:
+        gc.enable()
+    assert cases.worst.complexity == "Θ(n)"
+
+def test_write_summary_matches_string_summary():
+    """Escribir el resumen en un stream produce el mismo texto que el metodo que lo devuelve."""
+    import io
+
+    analyzer = CaseAnalyzer()
+    cases = analyzer.analyze_all_cases(parse_code(BUSQUEDA), complexity="n")
+    out = io.StringIO()
+    analyzer.write_case_comparison_summary(cases, out)
+
+    assert out.getvalue() == analyzer.get_case_comparison_summary(cases)
+    assert "WORST CASO (WORST)" in out.getvalue()
+
+
+def test_unknown_node_types_are_traversed():
+    """Un tipo de nodo fuera de la tabla de hijos se recorre a partir de sus atributos."""
+    class Bloque(Node):
+        def __init__(self, stmts):
+            self.stmts = stmts
+
+    func = Function("f", ["n"], [Bloque([Call("f", [Var("n")])])])
+    analyzer = CaseAnalyzer()
+
+    assert analyzer._count_recursive_calls(func, "f") == 1
+    assert analyzer._detect_algorithm_type(Program([func])) == 'recursive'
+    assert Bloque not in _CHILDREN
+
+
+def test_dataclass_node_fields_are_memoized_per_class():
+    """Un Node dataclass fuera de la tabla se recorre por sus campos declarados, memorizados aparte."""
+    from dataclasses import dataclass
+    from src.analyzer.case_analyzer import _declared_child_fields
+
+    @dataclass
+    class Envoltura(Node):
+        inner: Node
+        etiqueta: str = ""
+
+    func = Function("g", ["n"], [Envoltura(Call("g", [Var("n")]))])
+    analyzer = CaseAnalyzer()
+
+    assert analyzer._count_recursive_calls(func, "g") == 1
+    assert _declared_child_fields(Envoltura) == ('etiqueta', 'inner')
+    assert Envoltura not in _CHILDREN
+
+
+def test_refine_does_not_read_n_squared_as_exponential():
+    """Solo 2^ / 2** activan la regla exponencial; n log n con espacios es divide y venceras."""
+    ast = parse_code(BUSQUEDA)
+    analyzer = CaseAnalyzer()
+
+    assert analyzer._validate_and_refine_type('nested_loops', None, "Θ(n^2)", ast) == 'nested_loops'
+    assert analyzer._validate_and_refine_type('unknown', None, "O(2^n)", ast) == 'recursive'
+    assert analyzer._validate_and_refine_type('unknown', None, "2**n", ast) == 'recursive'
+    assert analyzer._validate_and_refine_type('unknown', None, "Θ(n log n)", ast) == 'divide_conquer'
+
+
+def test_pivot_identifier_found_anywhere_in_ast():
+    """Un pivote anidado en una asignacion basta para tratar divide y venceras como QuickSort."""
+    body = [
+        Assignment("p", Var("pivote")),
+        Call("ordenar", [Var("izq")]),
+        Call("ordenar", [Var("der")]),
+    ]
+    ast = Program([Function("ordenar", ["a"], body)])
+    analyzer = CaseAnalyzer()
+
+    assert analyzer._extract_features(ast).saw_pivot_identifier
+    worst = analyzer.analyze_all_cases(ast, complexity="n log n")['worst']
+    assert "pivote" in worst.scenario
+
+
+def test_recursive_call_inside_modulo_is_found():
+    """Una autollamada dentro de una expresion % cuenta como recursion."""
+    ast = parse_code("""
+function f(n)
+begin
+    return call f(n - 1) % 7
+end
+""")
+
+    assert CaseAnalyzer()._has_recursion(ast)